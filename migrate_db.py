@@ -6,13 +6,15 @@ This script migrates data from SQLite to PostgreSQL database.
 It handles all tables, maintains data integrity, and provides progress tracking.
 """
 
+import io
+import itertools
 import sys
 import argparse
 import sqlite3
 import psycopg2
 import psycopg2.extras
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, Iterator
 import logging
 from datetime import datetime
 
@@ -32,7 +34,15 @@ except ImportError:
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 from novel_parser.config import Config
+from novel_parser.storage.postgresql_storage import copy_field, pg_timestamp
+from novel_parser.storage.sqlite_storage import folder_names
 
+# Rows per COPY; large enough to amortize the round trip, small enough to buffer
+COPY_BATCH_ROWS = 50000
+# Novels per INSERT ... VALUES statement, which needs their ids back
+NOVEL_BATCH_ROWS = 1000
+# Rows fetched from SQLite at a time while streaming
+SQLITE_FETCH_ROWS = 10000
 
 class DatabaseMigrator:
     """Handles migration from SQLite to PostgreSQL."""
@@ -76,6 +86,11 @@ class DatabaseMigrator:
 
         conn = sqlite3.connect(self.sqlite_path)
         conn.row_factory = sqlite3.Row
+        # Read-only bulk scans: map the file and give the page cache room (~256 MB)
+        conn.execute("PRAGMA query_only=ON")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-262144")
+        conn.execute("PRAGMA temp_store=MEMORY")
         return conn
 
     def connect_postgres(self) -> psycopg2.extensions.connection:
@@ -84,29 +99,24 @@ class DatabaseMigrator:
         conn.cursor_factory = psycopg2.extras.RealDictCursor
         return conn
 
-    def get_sqlite_data(self) -> Dict[str, List[Dict[str, Any]]]:
-        """Extract all data from SQLite database."""
+    def get_sqlite_counts(self, sqlite_conn: sqlite3.Connection) -> Dict[str, int]:
+        """Count the rows to migrate from SQLite."""
         self.logger.info("Extracting data from SQLite database...")
 
-        sqlite_conn = self.connect_sqlite()
-        cursor = sqlite_conn.cursor()
-
-        data = {}
+        counts = {}
+        for table in ('novels', 'chapters'):
+            counts[table] = sqlite_conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            self.logger.info(f"Found {counts[table]} {table}")
 
-        # Get novels
-        cursor.execute("SELECT * FROM novels ORDER BY id")
-        novels = [dict(row) for row in cursor.fetchall()]
-        data['novels'] = novels
-        self.logger.info(f"Found {len(novels)} novels")
+        return counts
 
-        # Get chapters
-        cursor.execute("SELECT * FROM chapters ORDER BY novel_id, chapter_index")
-        chapters = [dict(row) for row in cursor.fetchall()]
-        data['chapters'] = chapters
-        self.logger.info(f"Found {len(chapters)} chapters")
-
-        sqlite_conn.close()
-        return data
+    def iter_rows(self, sqlite_conn: sqlite3.Connection, query: str) -> Iterator[sqlite3.Row]:
+        """Stream the rows of a SQLite query without loading the whole result."""
+        cursor = sqlite_conn.cursor()
+        cursor.arraysize = SQLITE_FETCH_ROWS
+        cursor.execute(query)
+        while rows := cursor.fetchmany():
+            yield from rows
 
     def create_postgres_tables(self) -> None:
         """Create PostgreSQL tables."""
@@ -131,21 +141,26 @@ class DatabaseMigrator:
             author TEXT,
             file_path TEXT UNIQUE NOT NULL,
             chapter_count INTEGER NOT NULL,
-            modified_time TEXT NOT NULL
+            modified_time TIMESTAMPTZ NOT NULL,
+            file_size BIGINT,
+            content_hash TEXT,
+            folder_parts TEXT[]
         )
         ''')
 
-        # Create chapters table
+        # Create chapters table; UNLOGGED and without keys while it is bulk loaded,
+        # migrate_data adds them and switches it to LOGGED afterwards
         cursor.execute('''
-        CREATE TABLE chapters (
-            id SERIAL PRIMARY KEY,
+        CREATE UNLOGGED TABLE chapters (
+            id SERIAL,
             novel_id INTEGER NOT NULL,
             title TEXT NOT NULL,
             start_line INTEGER,
             end_line INTEGER,
+            start_byte BIGINT,
+            end_byte BIGINT,
             chapter_index INTEGER NOT NULL,
-            spine_id TEXT,
-            FOREIGN KEY (novel_id) REFERENCES novels (id) ON DELETE CASCADE
+            spine_id TEXT
         )
         ''')
 
@@ -153,49 +168,97 @@ class DatabaseMigrator:
         postgres_conn.close()
         self.logger.info("PostgreSQL tables created successfully")
 
-    def migrate_data(self, data: Dict[str, List[Dict[str, Any]]]) -> None:
+    def migrate_data(self, sqlite_conn: sqlite3.Connection, counts: Dict[str, int]) -> None:
         """Migrate data to PostgreSQL."""
         self.logger.info("Migrating data to PostgreSQL...")
 
         if self.dry_run:
             self.logger.info("DRY RUN: Would migrate data to PostgreSQL")
-            self.logger.info(f"Would migrate {len(data['novels'])} novels and {len(data['chapters'])} chapters")
+            self.logger.info(f"Would migrate {counts['novels']} novels and {counts['chapters']} chapters")
             return
 
+        # Databases from before file_size was added lack the column
+        columns = {row['name'] for row in sqlite_conn.execute("PRAGMA table_info(novels)")}
+        file_size = 'file_size' if 'file_size' in columns else 'NULL AS file_size'
+        content_hash = 'content_hash' if 'content_hash' in columns else 'NULL AS content_hash'
+        # ... and those from before byte offsets the chapter ones
+        columns = {row['name'] for row in sqlite_conn.execute("PRAGMA table_info(chapters)")}
+        byte_range = ('start_byte, end_byte' if 'start_byte' in columns
+                      else 'NULL AS start_byte, NULL AS end_byte')
+
         postgres_conn = self.connect_postgres()
         cursor = postgres_conn.cursor()
 
         try:
-            # Migrate novels
-            novel_id_mapping = {}
-            for i, novel in enumerate(data['novels']):
-                cursor.execute('''
-                INSERT INTO novels (title, author, file_path, chapter_count, modified_time)
-                VALUES (%s, %s, %s, %s, %s) RETURNING id
-                ''', (novel['title'], novel['author'], novel['file_path'],
-                      novel['chapter_count'], novel['modified_time']))
-
-                new_id = cursor.fetchone()['id']
-                novel_id_mapping[novel['id']] = new_id
+            # A crash mid-load means rerunning the migration anyway
+            cursor.execute("SET LOCAL synchronous_commit = off")
+            cursor.execute("SET LOCAL maintenance_work_mem = '512MB'")
 
-                if (i + 1) % 100 == 0:
-                    self.logger.info(f"Migrated {i + 1}/{len(data['novels'])} novels")
-
-            self.logger.info(f"Migrated all {len(data['novels'])} novels")
-
-            # Migrate chapters
-            for i, chapter in enumerate(data['chapters']):
+            # Migrate novels, one multi-row INSERT per batch
+            novel_id_mapping = {}
+            migrated = 0
+            novels = self.iter_rows(sqlite_conn, f'''
+            SELECT id, title, author, file_path, chapter_count, modified_time, {file_size},
+                   {content_hash}
+            FROM novels ORDER BY id
+            ''')
+            for batch in itertools.batched(novels, NOVEL_BATCH_ROWS):
+                rows = psycopg2.extras.execute_values(cursor, '''
+                INSERT INTO novels (title, author, file_path, chapter_count, modified_time, file_size,
+                                    content_hash, folder_parts)
+                VALUES %s RETURNING id, file_path
+                ''', [(novel['title'], novel['author'], novel['file_path'], novel['chapter_count'],
+                       pg_timestamp(novel['modified_time']), novel['file_size'], novel['content_hash'],
+                       folder_names(novel['file_path']))
+                      for novel in batch], page_size=NOVEL_BATCH_ROWS, fetch=True)
+
+                # RETURNING order is not guaranteed; file_path is unique on both sides
+                new_ids = {row['file_path']: row['id'] for row in rows}
+                for novel in batch:
+                    novel_id_mapping[novel['id']] = new_ids[novel['file_path']]
+
+                migrated += len(batch)
+                self.logger.info(f"Migrated {migrated}/{counts['novels']} novels")
+
+            self.logger.info(f"Migrated all {counts['novels']} novels")
+
+            # Migrate chapters, streamed through COPY in batches
+            buffer = io.StringIO()
+            chapters = self.iter_rows(sqlite_conn, f'''
+            SELECT novel_id, title, start_line, end_line, {byte_range}, chapter_index, spine_id
+            FROM chapters ORDER BY novel_id, chapter_index
+            ''')
+            for i, chapter in enumerate(chapters):
                 new_novel_id = novel_id_mapping[chapter['novel_id']]
-                cursor.execute('''
-                INSERT INTO chapters (novel_id, title, start_line, end_line, chapter_index, spine_id)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                ''', (new_novel_id, chapter['title'], chapter['start_line'],
-                      chapter['end_line'], chapter['chapter_index'], chapter['spine_id']))
-
-                if (i + 1) % 1000 == 0:
-                    self.logger.info(f"Migrated {i + 1}/{len(data['chapters'])} chapters")
-
-            self.logger.info(f"Migrated all {len(data['chapters'])} chapters")
+                buffer.write('\t'.join(map(copy_field, (
+                    new_novel_id, chapter['title'], chapter['start_line'], chapter['end_line'],
+                    chapter['start_byte'], chapter['end_byte'], chapter['chapter_index'],
+                    chapter['spine_id']
+                ))))
+                buffer.write('\n')
+
+                if (i + 1) % COPY_BATCH_ROWS == 0:
+                    self._copy_chapters(cursor, buffer)
+                    buffer = io.StringIO()
+                    self.logger.info(f"Migrated {i + 1}/{counts['chapters']} chapters")
+
+            if buffer.tell():
+                self._copy_chapters(cursor, buffer)
+
+            self.logger.info(f"Migrated all {counts['chapters']} chapters")
+
+            # One index build per constraint over the loaded rows, not one update per row
+            cursor.execute("ALTER TABLE chapters ADD PRIMARY KEY (id)")
+            cursor.execute('''
+            ALTER TABLE chapters
+            ADD FOREIGN KEY (novel_id) REFERENCES novels (id) ON DELETE CASCADE
+            ''')
+            cursor.execute('''
+            CREATE INDEX idx_chapters_novel_index ON chapters (novel_id, chapter_index)
+            INCLUDE (title)
+            ''')
+            cursor.execute("ALTER TABLE chapters SET LOGGED")
+            self.logger.info("Built chapter constraints and indexes")
 
             postgres_conn.commit()
             self.logger.info("Data migration completed successfully")
@@ -207,7 +270,18 @@ class DatabaseMigrator:
         finally:
             postgres_conn.close()
 
-    def verify_migration(self, original_data: Dict[str, List[Dict[str, Any]]]) -> bool:
+    @staticmethod
+    def _copy_chapters(cursor, buffer: io.StringIO) -> None:
+        """Send one batch of COPY text-format chapter rows."""
+        buffer.seek(0)
+        cursor.copy_expert(
+            "COPY chapters (novel_id, title, start_line, end_line, start_byte, end_byte, "
+            "chapter_index, spine_id) "
+            "FROM STDIN WITH (FORMAT text)",
+            buffer
+        )
+
+    def verify_migration(self, counts: Dict[str, int]) -> bool:
         """Verify migration integrity."""
         self.logger.info("Verifying migration integrity...")
 
@@ -222,7 +296,7 @@ class DatabaseMigrator:
             # Check novels count
             cursor.execute("SELECT COUNT(*) as count FROM novels")
             novels_count = cursor.fetchone()['count']
-            expected_novels = len(original_data['novels'])
+            expected_novels = counts['novels']
 
             if novels_count != expected_novels:
                 self.logger.error(f"Novel count mismatch: expected {expected_novels}, got {novels_count}")
@@ -231,7 +305,7 @@ class DatabaseMigrator:
             # Check chapters count
             cursor.execute("SELECT COUNT(*) as count FROM chapters")
             chapters_count = cursor.fetchone()['count']
-            expected_chapters = len(original_data['chapters'])
+            expected_chapters = counts['chapters']
 
             if chapters_count != expected_chapters:
                 self.logger.error(f"Chapter count mismatch: expected {expected_chapters}, got {chapters_count}")
@@ -254,17 +328,24 @@ class DatabaseMigrator:
             self.logger.info(f"Target: PostgreSQL ({self.postgres_url})")
             self.logger.info(f"Dry run: {self.dry_run}")
 
-            # Extract data from SQLite
-            data = self.get_sqlite_data()
+            # Rows are streamed from SQLite while they are migrated
+            sqlite_conn = self.connect_sqlite()
+            try:
+                # One read transaction, so the counts and every scan see the same snapshot
+                # even if the monitor keeps writing to the database meanwhile
+                sqlite_conn.execute("BEGIN DEFERRED")
+                counts = self.get_sqlite_counts(sqlite_conn)
 
-            # Create PostgreSQL tables
-            self.create_postgres_tables()
+                # Create PostgreSQL tables
+                self.create_postgres_tables()
 
-            # Migrate data
-            self.migrate_data(data)
+                # Migrate data
+                self.migrate_data(sqlite_conn, counts)
+            finally:
+                sqlite_conn.close()
 
             # Verify migration
-            if not self.verify_migration(data):
+            if not self.verify_migration(counts):
                 self.logger.error("Migration verification failed")
                 return False
 
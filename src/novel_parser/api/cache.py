@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of serialized responses with a TTL.
+
+    Entries are tagged with the storage version they were built from; a
+    lookup with a newer version drops everything cached so far. Both the
+    number of entries and their total size in bytes are bounded. Values are
+    bytes, or anything else stored with the size of the body it carries.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, max_bytes: int = 32 * 1024 * 1024):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[float, Any, int]] = OrderedDict()
+        self._bytes = 0
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: int) -> Any:
+        with self._lock:
+            if version < self._version:
+                return None  # Read just before a concurrent write: a miss, not a reset
+            if version > self._version:
+                self._clear()
+                self._version = version
+                return None
+
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value, _ = entry
+            if expires_at < time.monotonic():
+                self._pop(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, version: int, size: int | None = None) -> None:
+        with self._lock:
+            if version < self._version:
+                return  # Built from data that has changed since
+            if version > self._version:
+                self._clear()
+                self._version = version
+
+            if key in self._entries:
+                self._pop(key)
+            if size is None:
+                size = len(value)
+            # A single huge body (a whole book stored as one chapter) would push
+            # out most of the cache; it is cheaper to rebuild it when asked again
+            if size > self.max_bytes // 4:
+                return
+
+            self._entries[key] = (time.monotonic() + self.ttl, value, size)
+            self._bytes += size
+            while len(self._entries) > self.maxsize or self._bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def _pop(self, key: Hashable) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def _clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
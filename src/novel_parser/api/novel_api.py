@@ -1,4 +1,13 @@
-from fastapi import FastAPI, HTTPException, Query
+import hashlib
+from contextlib import asynccontextmanager
+from typing import Any
+
+import anyio.to_thread
+import orjson
+from fastapi import FastAPI, Header, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 
@@ -8,38 +17,177 @@ from ..models import (
     ChapterContent,
 )
 from ..storage.database_interface import DatabaseInterface
+from .cache import ResponseCache
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson instead of the stdlib encoder."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that lets browsers reuse assets without asking again."""
+
+    # Asset URLs aren't versioned, so not immutable: a day, then the
+    # ETag/Last-Modified StaticFiles already sends makes revalidation a 304
+    cache_control = "public, max-age=86400"
+
+    def file_response(self, *args, **kwargs) -> Response:
+        response = super().file_response(*args, **kwargs)
+        response.headers.setdefault("Cache-Control", self.cache_control)
+        return response
+
+
+DEFAULT_COVER_URL = NovelInfo.model_fields["cover_url"].default
+
+# The status body never changes, so encode it once
+_STATUS_BYTES = orjson.dumps({"status": "running"})
+
+PAGE_LIMIT_DOC = "Results per page, ordered by id; every match if unset"
+
+# Storage calls block, so handlers run them on AnyIO's worker threads;
+# the default of 40 is raised so slow file reads don't starve searches.
+# It is deliberately larger than the storage connection pools: both block
+# until a connection is free, and chapter reads give theirs back before
+# the file read, so extra threads wait on disk rather than on the pool.
+THREADPOOL_SIZE = 64
+
+MIB = 1024 * 1024
+
+
+def _dump_novels(novels: list[dict]) -> bytes:
+    # Storage rows already match NovelInfo apart from the cover
+    for novel in novels:
+        novel.setdefault("cover_url", DEFAULT_COVER_URL)
+    return orjson.dumps(novels)
+
+
+def _body_etag(payload: bytes) -> str:
+    # Taken from the body itself, so every API worker tags identical content
+    # alike, across restarts too
+    return f'W/"{hashlib.blake2b(payload, digest_size=12).hexdigest()}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # Weak comparison: W/ prefixes don't matter for If-None-Match. "*" is not
+    # honoured, since it would answer 304 before the resource is known to exist.
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque
+               for tag in if_none_match.split(","))
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    yield
 
 
 def create_app(novel_storage: DatabaseInterface) -> FastAPI:
-    app = FastAPI(title="Novel Parser API", version="2.0.0")
+    app = FastAPI(
+        title="Novel Parser API",
+        version="2.0.0",
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan,
+    )
+
+    # Chapter text compresses several times over; small payloads aren't worth it
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
 
     static_path = Path(__file__).parent.parent / "static"
     if static_path.exists():
-        app.mount("/static", StaticFiles(directory=str(static_path)), name="static")
-
-    @app.get("/api/novels/search", response_model=list[NovelInfo])
-    async def search_novels(q: str = Query("", description="Search query")):
-        results = novel_storage.search_novels(q)
-        return results
-
-    @app.get("/api/folders/search/{foldername}", response_model=list[NovelInfo])
-    async def search_folders(foldername: str):
-        results = novel_storage.search_folders(foldername)
-        return results
-
-    @app.get("/api/novels/{novel_id}/chapters", response_model=list[ChapterInfo])
-    async def get_novel_chapters(novel_id: int):
-        results = novel_storage.get_novel_chapters(novel_id)
-        return results
-
-    @app.get("/api/chapters/{chapter_id}", response_model=ChapterContent)
-    async def get_chapter_content(chapter_id: int):
-        content = novel_storage.get_chapter_content(chapter_id)
-        if content is None:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Chapter {chapter_id} not found or content unavailable"
-            )
-        return ChapterContent(**content)
+        app.mount("/static", CachedStaticFiles(directory=str(static_path)), name="static")
+
+    # Serialized responses, dropped whenever novel_storage.version moves.
+    # Chapter content only changes when a novel is re-parsed, so it can
+    # stay cached much longer than search results. Byte budgets bound memory
+    # however large a chapter or a search result gets.
+    search_cache = ResponseCache(maxsize=1024, ttl=60, max_bytes=16 * MIB)
+    folders_cache = ResponseCache(maxsize=256, ttl=60, max_bytes=8 * MIB)
+    chapters_cache = ResponseCache(maxsize=1024, ttl=600, max_bytes=16 * MIB)
+    content_cache = ResponseCache(maxsize=256, ttl=3600, max_bytes=64 * MIB)
+
+    # Let clients keep chapters but revalidate, since re-parsing a file
+    # can change them; a matching ETag costs a bodiless 304.
+    cache_headers = {"Cache-Control": "no-cache"}
+
+    def _tagged_response(cached: tuple[bytes, str], if_none_match: str | None) -> Response:
+        payload, etag = cached
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag, **cache_headers})
+        return Response(payload, media_type="application/json",
+                        headers={"ETag": etag, **cache_headers})
+
+    @app.get("/api/novels/search", responses={200: {"model": list[NovelInfo]}})
+    async def search_novels(q: str = Query("", description="Search query"),
+                            limit: int | None = Query(None, ge=1, description=PAGE_LIMIT_DOC),
+                            offset: int = Query(0, ge=0)):
+        q = q.strip()
+        key = (q, limit, offset)
+        version = novel_storage.version
+        payload = search_cache.get(key, version)
+        if payload is None:
+            results = await run_in_threadpool(novel_storage.search_novels, q, limit, offset)
+            payload = _dump_novels(results)
+            search_cache.set(key, payload, version)
+        return Response(payload, media_type="application/json")
+
+    @app.get("/api/folders/search/{foldername}",
+             responses={200: {"model": list[NovelInfo]}})
+    async def search_folders(foldername: str,
+                             limit: int | None = Query(None, ge=1, description=PAGE_LIMIT_DOC),
+                             offset: int = Query(0, ge=0)):
+        key = (foldername, limit, offset)
+        version = novel_storage.version
+        payload = folders_cache.get(key, version)
+        if payload is None:
+            results = await run_in_threadpool(novel_storage.search_folders, foldername, limit, offset)
+            payload = _dump_novels(results)
+            folders_cache.set(key, payload, version)
+        return Response(payload, media_type="application/json")
+
+    # Storage already returns dicts shaped like the response models, so the
+    # chapter endpoints skip model validation and jsonable_encoder and hand
+    # the dicts straight to orjson. The models stay on for the OpenAPI docs.
+    @app.get("/api/novels/{novel_id}/chapters",
+             responses={200: {"model": list[ChapterInfo]}})
+    async def get_novel_chapters(novel_id: int,
+                                 if_none_match: str | None = Header(None)):
+        version = novel_storage.version
+        # (payload, ETag), so a revalidation served from the cache hashes nothing
+        cached = chapters_cache.get(novel_id, version)
+        if cached is None:
+            results = await run_in_threadpool(novel_storage.get_novel_chapters, novel_id)
+            payload = orjson.dumps(results)
+            cached = (payload, _body_etag(payload))
+            chapters_cache.set(novel_id, cached, version, len(payload))
+        return _tagged_response(cached, if_none_match)
+
+    @app.get("/api/chapters/{chapter_id}",
+             responses={200: {"model": ChapterContent}})
+    async def get_chapter_content(chapter_id: int,
+                                  if_none_match: str | None = Header(None)):
+        version = novel_storage.version
+        cached = content_cache.get(chapter_id, version)
+        if cached is None:
+            content = await run_in_threadpool(novel_storage.get_chapter_content, chapter_id)
+            if content is None:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Chapter {chapter_id} not found or content unavailable"
+                )
+            payload = orjson.dumps(content)
+            cached = (payload, _body_etag(payload))
+            content_cache.set(chapter_id, cached, version, len(payload))
+        return _tagged_response(cached, if_none_match)
+
+    @app.get("/api/status")
+    async def get_status():
+        return Response(_STATUS_BYTES, media_type="application/json")
 
     return app
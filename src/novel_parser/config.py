@@ -20,6 +20,17 @@ class Config:
     API_HOST: str = os.getenv("API_HOST", "0.0.0.0")
     API_PORT: int = int(os.getenv("API_PORT", "5001"))
     DOCS_DIR: str = os.getenv("DOCS_DIR", "docs")
+    # API worker processes; more than 1 runs the monitor in the supervisor process
+    API_WORKERS: int = int(os.getenv("API_WORKERS", "1"))
+    # Set to false when the monitor runs as its own process (novel-parser-monitor)
+    RUN_MONITOR: bool = os.getenv("RUN_MONITOR", "true").lower() in ("1", "true", "yes")
+
+    # File monitor: seconds of quiet to wait before parsing a changed file
+    MONITOR_DEBOUNCE_SECONDS: float = float(os.getenv("MONITOR_DEBOUNCE_SECONDS", "0.5"))
+    # File monitor: poll every this many seconds instead of using inotify and friends;
+    # unset polls network mounts every 30s, 0 never polls
+    MONITOR_POLL_INTERVAL: float | None = (float(os.environ["MONITOR_POLL_INTERVAL"])
+                                           if os.getenv("MONITOR_POLL_INTERVAL") else None)
 
     @classmethod
     def get_database_url(cls) -> str:
@@ -37,6 +48,12 @@ class Config:
         if cls.DATABASE_TYPE not in ["sqlite", "postgresql"]:
             raise ValueError(f"Invalid DATABASE_TYPE: {cls.DATABASE_TYPE}. Must be 'sqlite' or 'postgresql'")
 
+        if cls.MONITOR_POLL_INTERVAL is not None and cls.MONITOR_POLL_INTERVAL < 0:
+            raise ValueError("MONITOR_POLL_INTERVAL must not be negative")
+
+        if cls.API_WORKERS < 1:
+            raise ValueError("API_WORKERS must be at least 1")
+
         if cls.DATABASE_TYPE == "postgresql":
             if not cls.DATABASE_URL:
                 raise ValueError("DATABASE_URL is required when using PostgreSQL")
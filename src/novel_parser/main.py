@@ -1,6 +1,7 @@
 import sys
 import threading
 import signal
+from importlib.util import find_spec
 from pathlib import Path
 
 # Load environment variables from .env file if it exists
@@ -43,11 +44,34 @@ def start_monitor():
     global storage, monitor, monitor_thread
 
     storage = create_storage()
-    monitor = NovelMonitor([Config.DOCS_DIR], storage)
+    monitor = NovelMonitor([Config.DOCS_DIR], storage,
+                           debounce_seconds=Config.MONITOR_DEBOUNCE_SECONDS,
+                           poll_interval=Config.MONITOR_POLL_INTERVAL)
     monitor_thread = threading.Thread(target=monitor.start, daemon=True)
     monitor_thread.start()
 
 
+def monitor_main():
+    """Run only the file monitor, as a process separate from the API."""
+    global storage, monitor
+    Config.validate_config()
+
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    setup_directories()
+    storage = create_storage()
+    monitor = NovelMonitor([Config.DOCS_DIR], storage,
+                           debounce_seconds=Config.MONITOR_DEBOUNCE_SECONDS,
+                           poll_interval=Config.MONITOR_POLL_INTERVAL)
+    monitor.start()  # Blocks until a signal stops it
+
+
+def app_factory():
+    """Build the app in each uvicorn worker process, with its own storage."""
+    return create_app(create_storage())
+
+
 def stop_monitor():
     global monitor
     if monitor:
@@ -60,6 +84,7 @@ def signal_handler(_signum, _frame):
 
 
 def main():
+    global storage
     # Validate configuration
     Config.validate_config()
 
@@ -67,12 +92,33 @@ def main():
     signal.signal(signal.SIGTERM, signal_handler)
 
     setup_directories()
-    start_monitor()
+    if Config.RUN_MONITOR:
+        start_monitor()
+    else:
+        storage = create_storage()
 
-    app = create_app(storage)
+    # With several workers the monitor stays in this supervisor process, and
+    # each worker imports app_factory and opens its own storage
+    if Config.API_WORKERS > 1:
+        app, workers = "novel_parser.main:app_factory", Config.API_WORKERS
+    else:
+        app, workers = create_app(storage), None
 
     import uvicorn
-    uvicorn.run(app, host=Config.API_HOST, port=Config.API_PORT)
+    # uvloop/httptools ship with uvicorn[standard] (not on Windows); ask for
+    # them explicitly so a missing extra doesn't silently fall back to asyncio/h11
+    uvicorn.run(
+        app,
+        factory=workers is not None,
+        workers=workers,
+        host=Config.API_HOST,
+        port=Config.API_PORT,
+        loop="uvloop" if find_spec("uvloop") else "asyncio",
+        http="httptools" if find_spec("httptools") else "h11",
+    )
+
+    stop_monitor()
+    storage.close()
 
 
 if __name__ == '__main__':
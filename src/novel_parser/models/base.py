@@ -30,12 +30,15 @@ class NovelMetadata(BaseModel):
     file_path: str
     chapter_count: int
     chapters: list['ChapterMetadata']
+    content_hash: str | None = None  # Digest of the parsed file, see file_monitor.file_hash
 
 
 class ChapterMetadata(BaseModel):
     title: str
     start_line: int | None = None  # Line number where chapter content starts (1-based)
     end_line: int | None = None    # Line number where chapter content ends (exclusive)
+    start_byte: int | None = None  # File offsets of the same lines, for reading without an index
+    end_byte: int | None = None
     chapter_index: int
     spine_id: str | None = None  # EPUB spine item ID for content retrieval
 
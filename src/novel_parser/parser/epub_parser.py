@@ -1,22 +1,154 @@
+import html
+import os
+import posixpath
 import re
+import stat
+import zipfile
+from functools import lru_cache
 from pathlib import Path
-import ebooklib
-from ebooklib import epub
-from bs4 import BeautifulSoup
+from typing import NamedTuple
+from urllib.parse import unquote
+
+from lxml import etree
 
 from ..models.base import NovelMetadata, ChapterMetadata
 
+_AUTHOR_RE = re.compile(r'^(.+?)\s作者：(.+)$')
+# Any str.splitlines() boundary together with the whitespace around it
+_LINE_BREAK_RE = re.compile(r'\s*[\n\r\v\f\x1c-\x1e\x85\u2028\u2029]\s*')
+_HEADINGS = ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']
+# Elements that end a line of text, whether or not the source has a newline there
+_LINE_TAGS = _HEADINGS + ['p', 'div', 'br', 'li', 'blockquote', 'pre', 'tr', 'hr',
+                          'section', 'article', 'header', 'footer', 'dt', 'dd']
+
+# The first heading, when its text is plain (no nested tags) and so needs no parser
+_PLAIN_HEADING_RE = re.compile(
+    r'<h([1-6])(?:\s(?:[^>"\']|"[^"]*"|\'[^\']*\')*)?>([^<\r\0]*)</h\1\s*>', re.IGNORECASE
+)
+_HEADING_START_RE = re.compile(r'<h[1-6][\s/>]', re.IGNORECASE)
+
+_CONTAINER_NS = '{urn:oasis:names:tc:opendocument:xmlns:container}'
+_OPF_NS = '{http://www.idpf.org/2007/opf}'
+_DC_NS = '{http://purl.org/dc/elements/1.1/}'
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+
+    def _first_heading(html_content: str) -> str | None:
+        node = LexborHTMLParser(html_content).css_first(', '.join(_HEADINGS))
+        return node.text() if node else None
+
+    def _html_text(html_content: str) -> str:
+        tree = LexborHTMLParser(html_content)
+        for node in tree.css('script, style'):
+            node.decompose()
+        for node in tree.css(', '.join(_LINE_TAGS)):
+            node.insert_after('\n')
+        return tree.body.text() if tree.body else ''
+
+except ImportError:  # selectolax has no wheel here; BeautifulSoup on libxml2 instead
+    import warnings
+    from bs4 import BeautifulSoup, SoupStrainer, XMLParsedAsHTMLWarning
+
+    # EPUB chapters are XHTML, which lxml's HTML parser reads correctly
+    warnings.filterwarnings('ignore', category=XMLParsedAsHTMLWarning)
+
+    # Only headings are kept while parsing, so the rest of the tree is never built
+    _HEADING_STRAINER = SoupStrainer(_HEADINGS)
+
+    def _first_heading(html_content: str) -> str | None:
+        node = BeautifulSoup(html_content, 'lxml', parse_only=_HEADING_STRAINER).find(_HEADINGS)
+        return node.get_text() if node else None
+
+    def _html_text(html_content: str) -> str:
+        soup = BeautifulSoup(html_content, 'lxml')
+        for node in soup(['script', 'style']):
+            node.decompose()
+        for node in soup(_LINE_TAGS):
+            node.insert_after('\n')
+        return soup.body.get_text() if soup.body else ''
+
+
+def _chapter_title(html_content: str) -> str | None:
+    """Text of the first heading, without building a tree in the common cases."""
+    start = _HEADING_START_RE.search(html_content)
+    if start is None:
+        return None
+    match = _PLAIN_HEADING_RE.match(html_content, start.start())
+    prefix = html_content[:start.start()]
+    # A heading inside a comment or script is not the first one the parser would see
+    if match and '<!--' not in prefix and '<script' not in prefix.lower():
+        return html.unescape(match.group(2))
+    return _first_heading(html_content)
+
+
+class _Package(NamedTuple):
+    title: str | None
+    author: str | None
+    documents: dict[str, str]  # manifest id -> archive member, XHTML documents only
+    spine: list[str]  # manifest ids in reading order
+
+
+def _read_package(zf: zipfile.ZipFile) -> _Package:
+    """Read the OPF package document; no other member of the archive is touched."""
+    # Lenient about broken markup, and never resolves external entities
+    parser = etree.XMLParser(recover=True, resolve_entities=False)
+    container = etree.fromstring(zf.read('META-INF/container.xml'), parser)
+    for rootfile in container.iter(f'{_CONTAINER_NS}rootfile'):
+        if rootfile.get('media-type') == 'application/oebps-package+xml':
+            opf_path = rootfile.get('full-path')
+            break
+    else:
+        raise ValueError('EPUB container has no OPF rootfile')
+
+    opf = etree.fromstring(zf.read(opf_path), parser)
+    opf_dir = posixpath.dirname(opf_path)
+
+    metadata = opf.find(f'{_OPF_NS}metadata')
+    title = author = None
+    if metadata is not None:
+        title = metadata.findtext(f'{_DC_NS}title') or None
+        author = metadata.findtext(f'{_DC_NS}creator') or None
+
+    documents = {}
+    manifest = opf.find(f'{_OPF_NS}manifest')
+    for item in manifest.iterfind(f'{_OPF_NS}item') if manifest is not None else ():
+        if item.get('media-type') == 'application/xhtml+xml' and item.get('href'):
+            href = posixpath.join(opf_dir, unquote(item.get('href')))
+            documents[item.get('id')] = posixpath.normpath(href)
+
+    spine = opf.find(f'{_OPF_NS}spine')
+    return _Package(title, author, documents, [
+        itemref.get('idref') for itemref in spine.iterfind(f'{_OPF_NS}itemref')
+    ] if spine is not None else [])
+
+
+@lru_cache(maxsize=64)
+def _load_documents(path: str, mtime_ns: int, size: int) -> dict[str, str]:
+    """Archive member of every XHTML document by manifest id, kept for chapter reads.
+
+    mtime_ns and size are only part of the cache key, so a rewritten file
+    is read again.
+    """
+    with zipfile.ZipFile(path) as zf:
+        return _read_package(zf).documents
+
 
 class EpubParser:
     def parse_file(self, file_path: Path) -> NovelMetadata | None:
         file_path = Path(file_path)
-        if not file_path.exists():
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        if not stat.S_ISREG(st.st_mode):
             return None
 
-        book = epub.read_epub(str(file_path))
-
-        title, author = self._extract_metadata(book, file_path)
-        chapters = self._extract_chapters(book)
+        # Only the OPF and the spine documents are decompressed
+        with zipfile.ZipFile(file_path) as zf:
+            package = _read_package(zf)
+            title, author = self._extract_metadata(package, file_path)
+            chapters = self._extract_chapters(zf, package)
 
         return NovelMetadata(
             title=title,
@@ -26,95 +158,78 @@ class EpubParser:
             chapters=chapters
         )
 
-    def _extract_metadata(self, book, file_path: Path) -> tuple[str, str | None]:
-        title_meta = book.get_metadata('DC', 'title')
-        title = title_meta[0][0] if title_meta else file_path.stem
-
-        author_meta = book.get_metadata('DC', 'creator')
-        author = author_meta[0][0] if author_meta else None
+    def _extract_metadata(self, package: _Package, file_path: Path) -> tuple[str, str | None]:
+        title = package.title or file_path.stem
+        author = package.author
 
         if not author:
-            author_pattern = re.compile(r'(.+)\s作者：(.+)')
-            match = author_pattern.match(file_path.stem)
+            match = _AUTHOR_RE.match(file_path.stem)
             if match:
                 title = match.group(1).strip()
                 author = match.group(2).strip()
 
         return title, author
 
-    def _extract_chapters(self, book) -> list[ChapterMetadata]:
+    def _extract_chapters(self, zf: zipfile.ZipFile, package: _Package) -> list[ChapterMetadata]:
         chapters = []
         chapter_index = 0
 
-        # Get spine items in reading order
-        spine_items = [book.get_item_with_id(item_id)
-                      for item_id, _ in book.spine]
-
-        # Extract chapters in spine order
-        for item in spine_items:
-            if item.get_type() == ebooklib.ITEM_DOCUMENT:
-                # Get chapter title
-                content = item.get_content()
-                try:
-                    html_content = content.decode('utf-8')
-                except UnicodeDecodeError:
-                    html_content = content.decode('gb18030')
-
-                soup = BeautifulSoup(html_content, 'html.parser')
-                title_tag = soup.find(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
-                title = title_tag.get_text().strip() if title_tag else f"第{chapter_index + 1}章"
-
-                chapters.append(ChapterMetadata(
-                    title=title,
-                    chapter_index=chapter_index,
-                    spine_id=item.id  # Store spine ID separately
-                ))
-                chapter_index += 1
+        # Extract chapters in spine (reading) order
+        for item_id in package.spine:
+            member = package.documents.get(item_id)
+            if member is None:
+                continue
+            try:
+                content = zf.read(member)
+            except KeyError:  # listed in the manifest but missing from the archive
+                continue
+
+            # Get chapter title
+            title = _chapter_title(self._decode_html(content))
+            title = title.strip() if title is not None else f"第{chapter_index + 1}章"
+
+            chapters.append(ChapterMetadata(
+                title=title,
+                chapter_index=chapter_index,
+                spine_id=item_id  # Store spine ID separately
+            ))
+            chapter_index += 1
 
         return chapters
 
     def get_chapter_content(self, file_path: Path, chapter_id: str) -> str | None:
         """Get chapter content by chapter ID"""
         try:
-            book = epub.read_epub(str(file_path))
-            item = book.get_item_with_id(chapter_id)
-            if not item or item.get_type() != ebooklib.ITEM_DOCUMENT:
+            st = os.stat(file_path)
+            # The OPF is parsed once per file version; each chapter is then
+            # one lookup in the zip's central directory and one member read
+            documents = _load_documents(os.fspath(file_path), st.st_mtime_ns, st.st_size)
+            member = documents.get(chapter_id)
+            if member is None:
                 return None
 
-            content = item.get_content()
-            try:
-                return self._clean_html_content(content.decode('utf-8'))
-            except UnicodeDecodeError:
-                return self._clean_html_content(content.decode('gb18030'))
+            with zipfile.ZipFile(file_path) as zf:
+                return self._clean_html_content(zf.read(member))
         except Exception:
             return None
 
+    @staticmethod
+    def _decode_html(content: bytes) -> str:
+        try:
+            return content.decode('utf-8')
+        except UnicodeDecodeError:
+            return content.decode('gb18030')
+
     def _clean_html_content(self, html_content: str | bytes) -> str:
         # Handle both str and bytes input
         if isinstance(html_content, bytes):
-            try:
-                html_content = html_content.decode('utf-8')
-            except UnicodeDecodeError:
-                html_content = html_content.decode('gb18030')
-
-        soup = BeautifulSoup(html_content, 'html.parser')
-
-        # 移除脚本和样式标签
-        for script in soup(["script", "style"]):
-            script.decompose()
-
-        # 获取文本内容，保持段落结构
-        text = soup.get_text()
+            html_content = self._decode_html(html_content)
 
-        # 清理文本，保持换行结构
-        lines = []
-        for line in text.splitlines():
-            line = line.strip()
-            if line:  # 只保留非空行
-                lines.append(line)
+        # 移除脚本和样式标签后获取文本内容，保持段落结构
+        text = _html_text(html_content)
 
-        # 用换行符连接，保持段落结构
-        return '\n'.join(lines)
+        # 去掉每行首尾空白和空行，用换行符连接，保持段落结构
+        return _LINE_BREAK_RE.sub('\n', text).strip()
 
 
 
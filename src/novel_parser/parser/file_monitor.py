@@ -1,16 +1,116 @@
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from datetime import datetime
+from functools import partial
+from itertools import chain, islice
 from pathlib import Path
+from typing import Iterable
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+from watchdog.observers.polling import PollingObserver
+from watchdog.events import (
+    FileCreatedEvent,
+    FileDeletedEvent,
+    FileModifiedEvent,
+    FileMovedEvent,
+    FileSystemEventHandler,
+)
 
 from .txt_parser import NovelParser
 from .epub_parser import EpubParser
+from ..models.base import NovelMetadata
 from ..storage.database_interface import DatabaseInterface
 
+logger = logging.getLogger(__name__)
+
+
+def file_fingerprint(st: os.stat_result) -> tuple[str, int]:
+    """The (modified_time, file_size) pair stored with each novel."""
+    # 修改时间转换为ISO格式，保留微秒以区分同一秒内的多次保存
+    modified_time = datetime.fromtimestamp(st.st_mtime).isoformat(timespec='microseconds')
+    return modified_time, st.st_size
+
+
+def file_hash(file_path: str) -> str:
+    """Digest of the whole file, to tell a file that was only touched from an edited one."""
+    # Not just the head and tail: fixing a typo in the middle rarely changes the size
+    with open(file_path, 'rb') as f:
+        return hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+
+
+# inotify only sees changes made through this kernel, not on the file server
+_NETWORK_FILESYSTEMS = {'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', '9p', 'fuse.sshfs', 'fuse.rclone'}
+
+
+def _is_network_fs(path: Path) -> bool:
+    """Whether path lives on a network mount, judged by its longest match in /proc/mounts."""
+    try:
+        with open('/proc/mounts') as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return False  # Not Linux; the native observer is used
+
+    best, fstype = '', ''
+    for mount_point, mount_type in mounts:
+        mount_point = mount_point.replace('\\040', ' ')
+        if (str(path) + '/').startswith(mount_point.rstrip('/') + '/') and len(mount_point) > len(best):
+            best, fstype = mount_point, mount_type
+    return fstype in _NETWORK_FILESYSTEMS
+
+
+def _lower_worker_priority():
+    # 扫描进程降到最低优先级，初次导入时不和 API 抢 CPU
+    if hasattr(os, 'nice'):
+        os.nice(19)
+
+
+def parse_novel_file(file_path: str, stored_hash: str | None = None
+                     ) -> tuple[NovelMetadata | None, str, int, str]:
+    """Parse a novel file and return it with its fingerprint and content hash; runs in scan workers.
+
+    A file whose content hash is still stored_hash is not parsed, and None is
+    returned in place of the novel.
+    """
+    path = Path(file_path)
+    # Taken before parsing, so a write during the parse still looks changed later
+    modified_time, file_size = file_fingerprint(os.stat(path))
+    content_hash = file_hash(file_path)
+    if content_hash == stored_hash:
+        return None, modified_time, file_size, content_hash
+
+    parser = EpubParser() if path.suffix.lower() == '.epub' else NovelParser()
+    novel_data = parser.parse_file(path)
+    if novel_data:
+        novel_data.content_hash = content_hash
+    return novel_data, modified_time, file_size, content_hash
+
 
 class NovelFileHandler(FileSystemEventHandler):
-    def __init__(self, novel_storage: DatabaseInterface):
+    # Only these reach the handler; on inotify this also narrows the kernel mask,
+    # so reads of the library (open/close/access) no longer wake the observer
+    WATCHED_EVENTS = [FileCreatedEvent, FileModifiedEvent, FileDeletedEvent, FileMovedEvent]
+
+    # A file that keeps changing is still parsed at least this often (seconds)
+    MAX_DEBOUNCE_WAIT = 2.0
+    # Parsed novels are saved together once this many are waiting, or after FLUSH_SECONDS
+    FLUSH_SIZE = 500
+    FLUSH_SECONDS = 2.0
+
+    def __init__(self, novel_storage: DatabaseInterface, debounce_seconds: float = 0.5):
         self.storage = novel_storage
+        self.debounce_seconds = debounce_seconds
+        # 写入中的文件会连续触发事件，等安静下来再解析: path -> (first event, timer)
+        self._pending: dict[str, tuple[float, threading.Timer]] = {}
+        self._pending_lock = threading.Lock()
+        # 解析完等待写入的小说，攒一批在一个事务里保存
+        self._unsaved: list[tuple[NovelMetadata, str, int]] = []
+        self._unsaved_lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # keeps batches in the order they were taken
+        self._flush_timer: threading.Timer | None = None
         self.txt_parser = NovelParser()
         self.epub_parser = EpubParser()
         self.supported_extensions = {
@@ -20,104 +120,303 @@ class NovelFileHandler(FileSystemEventHandler):
 
     def on_created(self, event):
         if not event.is_directory and self._is_supported_file(event.src_path):
-            self._process_novel_file(event.src_path)
+            self._schedule_novel_file(event.src_path)
 
     def on_modified(self, event):
         if not event.is_directory and self._is_supported_file(event.src_path):
-            self._process_novel_file(event.src_path)
+            self._schedule_novel_file(event.src_path)
 
     def on_deleted(self, event):
         if not event.is_directory and self._is_supported_file(event.src_path):
+            self._cancel_pending(event.src_path)
+            self.flush()  # a queued save must not bring the novel back
             self.storage.delete_novel(event.src_path)
 
     def on_moved(self, event):
+        if not event.is_directory:
+            self._cancel_pending(event.src_path)
         if not event.is_directory and self._is_supported_file(event.dest_path):
+            self.flush()
             if Path(event.src_path).parent == Path(event.dest_path).parent:
                 self.storage.update_novel_path(event.src_path, event.dest_path)
             else:
                 self.storage.delete_novel(event.src_path)
                 self._process_novel_file(event.dest_path)
 
+    def _schedule_novel_file(self, file_path: str):
+        """Parse file_path once its events stop for debounce_seconds."""
+        if self.debounce_seconds <= 0:
+            self._process_novel_file(file_path)
+            return
+
+        with self._pending_lock:
+            now = time.monotonic()
+            first_event = now
+            pending = self._pending.get(file_path)
+            if pending:
+                first_event, timer = pending
+                timer.cancel()
+
+            delay = min(self.debounce_seconds,
+                        max(0.0, first_event + self.MAX_DEBOUNCE_WAIT - now))
+            timer = threading.Timer(delay, self._run_pending, args=(file_path,))
+            timer.daemon = True
+            self._pending[file_path] = (first_event, timer)
+            timer.start()
+
+    def _run_pending(self, file_path: str):
+        with self._pending_lock:
+            pending = self._pending.get(file_path)
+            # A newer event may have replaced this timer just as it fired; its
+            # replacement parses the file instead
+            if not pending or pending[1] is not threading.current_thread():
+                return
+            del self._pending[file_path]
+        self._process_novel_file(file_path)
+
+    def _cancel_pending(self, file_path: str | None = None):
+        """Drop the pending parse of file_path, or of every file if None."""
+        with self._pending_lock:
+            if file_path is None:
+                pending = list(self._pending.values())
+                self._pending.clear()
+            else:
+                pending = [self._pending.pop(file_path)] if file_path in self._pending else []
+        for _, timer in pending:
+            timer.cancel()
+
+    @staticmethod
+    def _file_ext(file_path: str) -> str:
+        # Called for every filesystem event; slicing is cheaper than building a Path
+        return file_path[file_path.rfind('.'):].lower()
+
     def _is_supported_file(self, file_path: str) -> bool:
-        file_ext = Path(file_path).suffix.lower()
-        return file_ext in self.supported_extensions
+        return self._file_ext(file_path) in self.supported_extensions
 
     def _process_novel_file(self, file_path: str):
-        file_path_obj = Path(file_path)
-        file_ext = file_path_obj.suffix.lower()
+        parser = self.supported_extensions.get(self._file_ext(file_path))
+        if parser is None:
+            return
+
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return
 
-        if file_ext not in self.supported_extensions:
+        # 只改了属性等情况下内容和大小都没变，不用重新解析
+        modified_time, file_size = file_fingerprint(st)
+        if self.storage.get_fingerprint(file_path) == (modified_time, file_size):
             return
 
-        parser = self.supported_extensions[file_ext]
-        novel_data = parser.parse_file(file_path_obj)
+        # 保存、git pull、rsync 常常只改了修改时间，内容没变的也不用重新解析
+        try:
+            content_hash = file_hash(file_path)
+        except OSError:
+            return
+        if self._mark_unchanged(file_path, content_hash, modified_time, file_size):
+            return
 
+        novel_data = parser.parse_file(Path(file_path))
         if novel_data:
-            # 获取文件修改时间并转换为ISO格式
-            mtime = file_path_obj.stat().st_mtime
-            modified_time = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(mtime))
-            self.storage.save_novel(novel_data, modified_time)
+            novel_data.content_hash = content_hash
+            self._queue_save(novel_data, modified_time, file_size)
+
+    def _mark_unchanged(self, file_path: str, content_hash: str,
+                        modified_time: str, file_size: int) -> bool:
+        """If file_path still has the content it was last parsed from, record its new fingerprint."""
+        # No flush can save an older parse of the file in between
+        with self._flush_lock:
+            with self._unsaved_lock:
+                for i in range(len(self._unsaved) - 1, -1, -1):
+                    novel_data = self._unsaved[i][0]
+                    if novel_data.file_path == file_path:
+                        # A queued parse is newer than what the database holds
+                        if novel_data.content_hash != content_hash:
+                            return False
+                        self._unsaved[i] = (novel_data, modified_time, file_size)
+                        return True
+
+            if self.storage.get_content_hash(file_path) != content_hash:
+                return False
+            self.storage.update_fingerprints([(file_path, modified_time, file_size)])
+            return True
+
+    def _queue_save(self, novel_data: NovelMetadata, modified_time: str, file_size: int):
+        with self._unsaved_lock:
+            self._unsaved.append((novel_data, modified_time, file_size))
+            if len(self._unsaved) < self.FLUSH_SIZE:
+                if self._flush_timer is None:
+                    self._flush_timer = threading.Timer(self.FLUSH_SECONDS, self.flush)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+                return
+        self.flush()
+
+    def flush(self):
+        """Save every parsed novel that is still waiting."""
+        with self._flush_lock:
+            with self._unsaved_lock:
+                batch, self._unsaved = self._unsaved, []
+                timer, self._flush_timer = self._flush_timer, None
+            if timer is not None:
+                timer.cancel()
+            if batch:
+                self.storage.save_novels(batch)
 
 
 class NovelMonitor:
-    def __init__(self, novel_dirs: list[str], novel_storage: DatabaseInterface):
+    # Parsed novels are written this many per transaction during the startup scan
+    SCAN_BATCH_SIZE = 500
+    # Seconds between rescans when a directory is on a network mount and must be polled
+    DEFAULT_POLL_INTERVAL = 30.0
+
+    def __init__(self, novel_dirs: list[str], novel_storage: DatabaseInterface,
+                 scan_workers: int | None = None, debounce_seconds: float = 0.5,
+                 poll_interval: float | None = None):
         self.novel_dirs = [Path(d).resolve() for d in novel_dirs]
         self.storage = novel_storage
-        self.observer = Observer()
-        self.handler = NovelFileHandler(novel_storage)
+        self.scan_workers = scan_workers or os.cpu_count() or 1
+        # 网络盘上的改动收不到 inotify 事件，只能定时轮询；本地盘用系统通知
+        if poll_interval is None and any(_is_network_fs(d) for d in self.novel_dirs):
+            poll_interval = self.DEFAULT_POLL_INTERVAL
+        if poll_interval:
+            self.observer = PollingObserver(timeout=poll_interval)
+        else:
+            self.observer = Observer()
+        self.handler = NovelFileHandler(novel_storage, debounce_seconds)
         self._is_running = False
 
     def start(self):
+        self._is_running = True
         self._scan_existing_files()
+        if not self._is_running:  # stop() was called during the scan
+            return
 
         for novel_dir in self.novel_dirs:
             if novel_dir.exists():
-                self.observer.schedule(self.handler, str(novel_dir), recursive=True)
+                self.observer.schedule(
+                    self.handler, str(novel_dir), recursive=True,
+                    event_filter=self.handler.WATCHED_EVENTS,
+                )
 
         self.observer.start()
-        self._is_running = True
 
         try:
-            while self._is_running:
-                time.sleep(1)
+            # Block until stop() ends the observer thread, without waking up to poll
+            self.observer.join()
         except KeyboardInterrupt:
             self.stop()
 
     def stop(self):
         self._is_running = False
-        self.observer.stop()
-        self.observer.join()
+        if self.observer.is_alive():
+            self.observer.stop()
+            self.observer.join()
+        self.handler._cancel_pending()
+        self.handler.flush()
 
     def _scan_existing_files(self):
-        # 1. 收集所有监控目录下的文件
-        existing_files = set()
-        for novel_dir in self.novel_dirs:
-            if not novel_dir.exists():
-                continue
+        # 1. 获取数据库中所有记录的修改时间和大小
+        db_fingerprints = self.storage.get_fingerprints()
+        seen_files = set()
 
-            for file_path in novel_dir.rglob('*'):
-                if not file_path.is_file() or not self.handler._is_supported_file(str(file_path)):
+        # 2. 边扫描边解析新文件和已修改的文件，修改时间和大小都没变的直接跳过；
+        #    只改了修改时间的由解析进程比对内容哈希后跳过
+        def changed_files():
+            for novel_dir in self.novel_dirs:
+                if not novel_dir.exists():
                     continue
-                existing_files.add(str(file_path.resolve()))
-
-        # 2. 获取数据库中的所有记录
-        db_records = {novel['file_path']: novel for novel in self.storage.search_novels()}
-
-        # 3. 清理已删除文件的记录
-        for db_path in db_records:
-            if db_path not in existing_files:
-                self.storage.delete_novel(db_path)
-
-        # 4. 处理新文件和已修改的文件
-        for file_path in existing_files:
-            path_obj = Path(file_path)
-            current_mtime = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(path_obj.stat().st_mtime))
-
-            if file_path in db_records:
-                # 文件存在于数据库中，检查是否需要更新
-                stored_mtime = db_records[file_path].get('modified_time', '')
-                if current_mtime != stored_mtime:
-                    self.handler._process_novel_file(file_path)
-            else:
-                # 新文件，添加到数据库
-                self.handler._process_novel_file(file_path)
\ No newline at end of file
+
+                for entry in self._iter_novel_files(str(novel_dir)):
+                    seen_files.add(entry.path)
+                    try:
+                        fingerprint = file_fingerprint(entry.stat())
+                    except OSError:
+                        continue  # removed since the directory was listed
+                    stored = db_fingerprints.get(entry.path)
+                    if fingerprint == stored:
+                        continue
+                    stored_hash = self.storage.get_content_hash(entry.path) if stored is not None else None
+                    yield entry.path, stored_hash
+
+        self._parse_files(changed_files())
+
+        # 3. 清理已删除文件的记录，一个事务删完
+        self.storage.delete_novels([db_path for db_path in db_fingerprints
+                                    if db_path not in seen_files])
+
+    def _iter_novel_files(self, root: str):
+        """Yield a DirEntry for every supported file under root.
+
+        Like rglob, symlinked directories are not followed and unreadable
+        directories are skipped. Paths are kept as found rather than resolved,
+        so they match the paths watchdog reports for later events.
+        """
+        stack = [root]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif self.handler._is_supported_file(entry.name) and entry.is_file():
+                            yield entry
+            except OSError:
+                continue
+
+    def _parse_files(self, files: Iterable[tuple[str, str | None]]):
+        """Parse (file_path, stored_hash) pairs as they are produced and save them in batches.
+
+        Files whose content still has their stored hash only get their new
+        fingerprint saved.
+        """
+        batch = []
+        touched = []  # (file_path, modified_time, file_size) of files whose content is unchanged
+
+        def collect(file, parse):
+            file_path, stored_hash = file
+            # One file deleted mid-scan or failing to parse must not end the scan:
+            # stale rows would stay and the observer would never start
+            try:
+                novel_data, modified_time, file_size, content_hash = parse()
+            except Exception:
+                logger.exception("Failed to parse %s", file_path)
+                return
+            if novel_data:
+                batch.append((novel_data, modified_time, file_size))
+            elif content_hash == stored_hash:  # not parsed; content unchanged
+                touched.append((file_path, modified_time, file_size))
+            if len(batch) >= self.SCAN_BATCH_SIZE:
+                self.storage.save_novels(batch)
+                batch.clear()
+
+        files = iter(files)
+        first = list(islice(files, 2))
+        if len(first) <= 1:
+            for file in first:
+                collect(file, partial(parse_novel_file, *file))
+        else:
+            # Even with one worker, parsing in a niced child process keeps the
+            # API process responsive. spawn: the monitor runs beside other
+            # threads, which fork doesn't survive safely. Workers are started
+            # on demand, so a short scan doesn't pay for all of them.
+            with ProcessPoolExecutor(max_workers=self.scan_workers,
+                                     mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=_lower_worker_priority) as executor:
+                # Keep only a few files per worker in flight, so the scan never
+                # runs far ahead of parsing and results are saved as they arrive
+                max_in_flight = self.scan_workers * 2
+                in_flight = {}  # future -> (file_path, stored_hash)
+                for file in chain(first, files):
+                    if len(in_flight) >= max_in_flight:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            collect(in_flight.pop(future), future.result)
+                    in_flight[executor.submit(parse_novel_file, *file)] = file
+
+                for future in as_completed(in_flight):
+                    collect(in_flight[future], future.result)
+
+        if batch:
+            self.storage.save_novels(batch)
+        self.storage.update_fingerprints(touched)
@@ -1,46 +1,175 @@
+import mmap
+import os
 import re
+import stat
+from array import array
+from functools import lru_cache
 from pathlib import Path
 from ..models.base import NovelMetadata, ChapterMetadata
 
 
+# Line endings as text mode's universal newlines sees them. Undecodable bytes
+# between '\r' and '\n' are dropped before newlines are translated, so those
+# still form one '\r\n'.
+_LINE_END_RE = re.compile(rb'\r(?:[\x80-\xff]*\n)?|\n')
+_LF_RE = re.compile(rb'\n')
+
+
+def _line_offsets_of(data) -> array:
+    """Byte offset of the start of every line in data (bytes or an mmap), plus its size at the end."""
+    offsets = array('q', [0])
+    if data.find(b'\r') == -1:
+        # Only '\n' ends lines: a plain byte search, which also needs no copy of an mmap
+        offsets.extend(m.end() for m in _LF_RE.finditer(data))
+    else:
+        for m in _LINE_END_RE.finditer(data):
+            start, end = m.span()
+            if end - start > 2 and data[start + 1:end - 1].decode('utf-8', 'ignore'):
+                offsets.append(start + 1)  # Text between them: '\r' and '\n' end two lines
+            offsets.append(end)
+    if offsets[-1] != len(data):
+        offsets.append(len(data))  # Last line has no newline
+    return offsets
+
+
+def _read_line_offsets(path: str) -> array:
+    """Byte offset of the start of every line, plus the file size at the end."""
+    with open(path, 'rb') as f:
+        return _line_offsets_of(f.read())
+
+
+@lru_cache(maxsize=32)
+def _line_offsets(path: str, mtime_ns: int, size: int) -> array:
+    """_read_line_offsets, cached for chapters stored without byte offsets.
+
+    mtime_ns and size are only part of the cache key, so a rewritten file
+    gets a fresh index.
+    """
+    return _read_line_offsets(path)
+
+
+def _line_range(offsets: array, start_line: int, end_line: int | None) -> tuple[int, int]:
+    """Byte range of lines [start_line, end_line), clamped to the file."""
+    line_count = len(offsets) - 1
+    start = min(start_line, line_count)
+    end = line_count if end_line is None else max(start, min(end_line, line_count))
+    return offsets[start], offsets[end]
+
+
 class FileReader:
     @staticmethod
-    def read_content_by_lines(file_path: Path, start_line: int, end_line: int) -> str:
+    def read_content_by_lines(file_path: Path, start_line: int, end_line: int | None) -> str:
         """Read content between line numbers (start_line inclusive, end_line exclusive)"""
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-            return ''.join(lines[start_line:end_line])
+        st = os.stat(file_path)
+        # Indexed once per file version; each chapter is then one seek and read
+        offsets = _line_offsets(os.fspath(file_path), st.st_mtime_ns, st.st_size)
+        return FileReader.read_content_by_bytes(file_path, *_line_range(offsets, start_line, end_line))
+
+    @staticmethod
+    def read_content_by_bytes(file_path: Path, start_byte: int, end_byte: int) -> str:
+        """Read the lines stored at [start_byte, end_byte) by the parser"""
+        with open(file_path, 'rb') as f:
+            f.seek(start_byte)
+            content = f.read(end_byte - start_byte).decode('utf-8', 'ignore')
+
+        # The same newline translation text mode would apply
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        return content
 
     @staticmethod
-    def read_full_content(file_path: Path) -> str:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            return f.read()
+    def read_full_content(file_path: Path) -> tuple[str, array]:
+        """The whole text, and the byte offsets of its lines taken from the same read."""
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return '', array('q', [0])  # mmap can't map an empty file
+            # Decode straight from the mapping rather than reading a bytes copy first
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mmap, 'MADV_SEQUENTIAL'):  # Not available on Windows
+                    # Decoding reads front to back; let the kernel read ahead
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                content = str(mm, 'utf-8', 'ignore')
+                # From the pages just decoded, so the offsets always match the text
+                offsets = _line_offsets_of(mm)
+
+        # Same newline translation as text mode, so line numbers agree with
+        # read_content_by_lines
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        return content, offsets
+
+
+# Title lines may have spaces anywhere ("第 一 章"), so every pattern allows
+# ' *' between characters, and the trailing length limits count non-space
+# characters only. This matches the lines in place, without stripping spaces
+# from a copy of the whole text first.
+_CN_NUM = r'[\d〇零一二两三四五六七八九十百千万壹贰叁肆伍陆柒捌玖拾佰仟]'
+_UP_TO_30 = r'(?: *[^ \n]){0,30} *$'
+_UP_TO_40 = r'(?: *[^ \n]){0,40} *$'
+# Every default title starts with one of these (or a leading space)
+_TITLE_FIRST_CHAR = r'[ 第序终尾楔引前后正番上中下外\dC☆★卷]'
+
+
+def _compile_title_regexes(patterns: list[str], first_char: str | None = None):
+    """Compile patterns into (line regex, newline-led regex).
+
+    The first matches a title at the start of any line. The second matches
+    the newline before a title: re can then jump from one '\n' to the next
+    instead of attempting a match at every character, and the optional
+    first_char lookahead rejects most prose lines after a single test.
+    """
+    joined = '|'.join(f'(?:{p})' for p in patterns)
+    guard = f'(?={first_char})' if first_char else ''
+    return (re.compile(joined, re.MULTILINE),
+            re.compile(f'\n{guard}(?:{joined})', re.MULTILINE))
 
 
 class NovelParser:
     CHAPTER_PATTERNS = [
-        r'^第[\d〇零一二两三四五六七八九十百千万壹贰叁肆伍陆柒捌玖拾佰仟]+[章节回卷].{0,30}$',
-        r'^[序终尾楔引前后][章言声子记].{0,30}$',
-        r'^(正文|番外).{0,30}$',
-        r'^[上中下外][部篇卷].{0,30}$',
-        r'^\d{1,4}(?![.：、&\d]).{0,40}$',
-        r'^Chapter.{0,30}$',
-        r'^[☆★].{0,30}$',
-        r'^卷[\d〇零一二两三四五六七八九十百千万壹贰叁肆伍陆柒捌玖拾佰仟]+.{0,30}$'
+        rf'^ *第(?: *{_CN_NUM})+ *[章节回卷]{_UP_TO_30}',
+        rf'^ *[序终尾楔引前后] *[章言声子记]{_UP_TO_30}',
+        rf'^ *(?:正 *文|番 *外){_UP_TO_30}',
+        rf'^ *[上中下外] *[部篇卷]{_UP_TO_30}',
+        rf'^ *\d(?: *\d){{0,3}}(?! *[.：、&\d]){_UP_TO_40}',
+        rf'^ *C *h *a *p *t *e *r{_UP_TO_30}',
+        rf'^ *[☆★]{_UP_TO_30}',
+        rf'^ *卷(?: *{_CN_NUM})+{_UP_TO_30}'
     ]
+    # All patterns in one MULTILINE regex so a single scan finds every title line
+    CHAPTER_REGEX, _NEXT_CHAPTER_REGEX = _compile_title_regexes(CHAPTER_PATTERNS, _TITLE_FIRST_CHAR)
+    # "书名 作者：某某" style file names
+    _AUTHOR_RE = re.compile(r'(.+)\s作者：(.+)')
+
+    def __init__(self, patterns: list[str] | None = None):
+        """patterns replace CHAPTER_PATTERNS; each must match a whole title line."""
+        if patterns is None:
+            # Shared, compiled once at import
+            self.chapter_regex = self.CHAPTER_REGEX
+            self._next_chapter_regex = self._NEXT_CHAPTER_REGEX
+        else:
+            self.chapter_regex, self._next_chapter_regex = _compile_title_regexes(patterns)
 
     def parse_file(self, file_path: Path) -> NovelMetadata | None:
         file_path = Path(file_path)
-        if not file_path.exists():
+        # One stat covers exists, is-a-regular-file and is-empty
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        if not stat.S_ISREG(st.st_mode) or st.st_size == 0:
             return None
 
-        content = FileReader.read_full_content(file_path)
+        content, offsets = FileReader.read_full_content(file_path)
         if not content:
             return None
 
         novel_title, author = self._extract_title_author(file_path)
         chapters = self._extract_chapters_with_lines(content)
 
+        # Stored with the chapters, so reading one is a seek without indexing the file first
+        for chapter in chapters:
+            chapter.start_byte, chapter.end_byte = _line_range(offsets, chapter.start_line, chapter.end_line)
+
         return NovelMetadata(
             title=novel_title,
             author=author,
@@ -51,27 +180,36 @@ class NovelParser:
 
     def _extract_title_author(self, file_path: Path) -> tuple[str, str | None]:
         file_name = file_path.stem
-        author_pattern = re.compile(r'(.+)\s作者：(.+)')
-        match = author_pattern.match(file_name)
+        match = self._AUTHOR_RE.match(file_name)
 
         if match:
             return match.group(1).strip(), match.group(2).strip()
         return file_name, None
 
     def _extract_chapters_with_lines(self, content: str) -> list[ChapterMetadata]:
-        lines = content.split('\n')
+        line_count = content.count('\n') + 1
         chapter_positions = []
 
-        for i, line in enumerate(lines):
-            line_cleaned = line.replace(' ', '')
-            if any(re.fullmatch(pattern, line_cleaned) for pattern in self.CHAPTER_PATTERNS):
-                chapter_positions.append((i, line))
+        # The first line has no newline in front of it
+        first = self.chapter_regex.match(content)
+        if first:
+            chapter_positions.append((0, first.group()))
+
+        # Later matches are '\n' plus a whole title line; line numbers are
+        # counted incrementally between matches.
+        line_num = 0
+        pos = 0
+        for match in self._next_chapter_regex.finditer(content):
+            line_start = match.start() + 1
+            line_num += content.count('\n', pos, line_start)
+            pos = line_start
+            chapter_positions.append((line_num, match.group()[1:]))
 
         if not chapter_positions:  # If no chapters found, treat the entire content as a single chapter
             return [ChapterMetadata(
                 title='正文',
                 start_line=0,
-                end_line=len(lines),
+                end_line=line_count,
                 chapter_index=0
             )]
 
@@ -82,7 +220,7 @@ class NovelParser:
             if i < len(chapter_positions) - 1:
                 end_line = chapter_positions[i + 1][0]  # Ends at next chapter title
             else:
-                end_line = len(lines)  # Last chapter ends at end of file
+                end_line = line_count  # Last chapter ends at end of file
 
             chapters.append({
                 'title': chapter_title,
@@ -6,6 +6,13 @@ from ..models.base import NovelMetadata
 class DatabaseInterface(ABC):
     """Abstract interface for database operations."""
 
+    # Incremented on every write so read caches know when to drop entries.
+    version: int = 0
+
+    def bump_version(self) -> None:
+        """Mark stored data as changed."""
+        self.version += 1
+
     @abstractmethod
     def connect(self) -> Any:
         """Create and return a database connection."""
@@ -16,24 +23,56 @@ class DatabaseInterface(ABC):
         """Close a database connection."""
         pass
 
+    def close(self) -> None:
+        """Release connections the storage keeps open."""
+        pass
+
     @abstractmethod
     def init_db(self) -> None:
         """Initialize database tables."""
         pass
 
     @abstractmethod
-    def save_novel(self, novel_data: NovelMetadata, modified_time: str) -> Optional[int]:
+    def save_novel(self, novel_data: NovelMetadata, modified_time: str,
+                   file_size: Optional[int] = None) -> Optional[int]:
         """Save or update novel data."""
         pass
 
     @abstractmethod
-    def search_novels(self, query: str = "") -> List[Dict]:
-        """Search novels by title or author."""
+    def save_novels(self, novels: List[Tuple[NovelMetadata, str, Optional[int]]]) -> List[Optional[int]]:
+        """Save or update several (novel_data, modified_time, file_size) in one transaction."""
+        pass
+
+    @abstractmethod
+    def get_fingerprint(self, file_path: str) -> Optional[Tuple[str, Optional[int]]]:
+        """Get the stored (modified_time, file_size) of a novel file."""
+        pass
+
+    @abstractmethod
+    def get_fingerprints(self) -> Dict[str, Tuple[str, Optional[int]]]:
+        """Get (modified_time, file_size) of every stored novel by file path."""
+        pass
+
+    @abstractmethod
+    def get_content_hash(self, file_path: str) -> Optional[str]:
+        """Get the content hash stored with a novel file."""
+        pass
+
+    @abstractmethod
+    def update_fingerprints(self, fingerprints: List[Tuple[str, str, Optional[int]]]) -> None:
+        """Set (file_path, modified_time, file_size) of novels whose content is unchanged."""
         pass
 
     @abstractmethod
-    def search_folders(self, folder_name: str) -> List[Dict]:
-        """Search novels by folder path."""
+    def search_novels(self, query: str = "", limit: Optional[int] = None,
+                      offset: int = 0) -> List[Dict]:
+        """Search novels by title or author, ordered by id; limit None returns every match."""
+        pass
+
+    @abstractmethod
+    def search_folders(self, folder_name: str, limit: Optional[int] = None,
+                       offset: int = 0) -> List[Dict]:
+        """Search novels by folder path, ordered by id; limit None returns every match."""
         pass
 
     @abstractmethod
@@ -51,6 +90,11 @@ class DatabaseInterface(ABC):
         """Delete a novel by file path."""
         pass
 
+    @abstractmethod
+    def delete_novels(self, file_paths: List[str]) -> int:
+        """Delete several novels by file path in one transaction; returns how many existed."""
+        pass
+
     @abstractmethod
     def update_novel_path(self, old_path: str, new_path: str) -> bool:
         """Update novel file path."""
@@ -1,16 +1,134 @@
+import io
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
 import psycopg2
 import psycopg2.extras
-from pathlib import Path
+from psycopg2.pool import ThreadedConnectionPool
 from typing import Dict, List, Optional, Tuple, Any
 from ..models.base import NovelMetadata
 from .database_interface import DatabaseInterface
+from .sqlite_storage import folder_names
+
+# Chapters per INSERT statement when saving a novel
+CHAPTER_PAGE_ROWS = 1000
+# Novels with at least this many chapters send them with COPY instead
+CHAPTER_COPY_ROWS = 500
+# Rows per FETCH when reading the whole novels table through a server-side cursor
+SCAN_FETCH_ROWS = 2000
+# Every write NOTIFYs this channel, so other processes drop their cached responses
+CHANGES_CHANNEL = 'novels_changed'
+# Seconds between attempts to reopen a lost LISTEN connection
+RELISTEN_INTERVAL = 5.0
+
+# The hot statements, each prepared on its first use on a pooled connection;
+# EXECUTE then skips parsing and planning them on every later call
+_PREPARED_STATEMENTS = {
+    'upsert_novel': '''
+        INSERT INTO novels (title, author, file_path, chapter_count, modified_time, file_size,
+                            content_hash, folder_parts)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+        ON CONFLICT (file_path) DO UPDATE SET
+            title = EXCLUDED.title, author = EXCLUDED.author,
+            chapter_count = EXCLUDED.chapter_count, modified_time = EXCLUDED.modified_time,
+            file_size = EXCLUDED.file_size, content_hash = EXCLUDED.content_hash,
+            folder_parts = EXCLUDED.folder_parts
+        RETURNING id
+    ''',
+    'novel_chapters': '''
+        SELECT id, title, chapter_index
+        FROM chapters
+        WHERE novel_id = $1
+        ORDER BY chapter_index
+    ''',
+    'chapter_content': '''
+        SELECT c.id, c.title, c.start_line, c.end_line, c.start_byte, c.end_byte,
+               c.spine_id, c.chapter_index, n.file_path
+        FROM chapters c
+        JOIN novels n ON c.novel_id = n.id
+        WHERE c.id = $1
+    ''',
+}
+
+
+class _PooledConnection(psycopg2.extensions.connection):
+    """A connection that remembers which _PREPARED_STATEMENTS exist in its session."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared: set[str] = set()
+        # Kept so the pid is still known once the connection is closed
+        self.backend_pid: int = self.get_backend_pid()
+
+
+def _execute_prepared(cursor, name: str, args: tuple) -> None:
+    """EXECUTE one of _PREPARED_STATEMENTS, preparing it first if this session lacks it."""
+    conn = cursor.connection
+    if name not in conn.prepared:
+        # Prepared statements belong to the session, so a later rollback keeps them
+        cursor.execute(f"PREPARE {name} AS {_PREPARED_STATEMENTS[name]}")
+        conn.prepared.add(name)
+    placeholders = ', '.join(['%s'] * len(args))
+    cursor.execute(f"EXECUTE {name} ({placeholders})", args)
+
+
+# COPY text format: tab-separated, backslash escapes, \N for NULL
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+class _WarmConnectionPool(ThreadedConnectionPool):
+    """A pool that keeps every returned connection open for the next caller.
+
+    ThreadedConnectionPool closes a returned connection once minconn are idle,
+    so past that much concurrency every call would pay a new connection and
+    login. Connections are still only opened as concurrency needs them.
+    """
+
+    def __init__(self, minconn: int, maxconn: int, *args, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        # putconn keeps a connection while fewer than minconn are idle
+        self.minconn = maxconn
+
+
+def copy_field(value: Any) -> str:
+    """Format one value as a field of COPY's text format."""
+    if value is None:
+        return '\\N'
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def pg_timestamp(modified_time: str) -> datetime:
+    """The TIMESTAMPTZ value of a fingerprint's modified_time, a naive local ISO string."""
+    return datetime.fromisoformat(modified_time).astimezone()
+
+
+def fingerprint_time(value: datetime) -> str:
+    """The inverse of pg_timestamp, so stored fingerprints compare equal to fresh ones."""
+    return value.astimezone().replace(tzinfo=None).isoformat(timespec='microseconds')
+
 
+def _novel_dicts(rows) -> List[Dict]:
+    """Rows of (id, title, author, file_path, chapter_count) as the dicts the API returns."""
+    return [
+        {'id': novel_id, 'title': title, 'author': author,
+         'file_path': file_path, 'chapter_count': chapter_count}
+        for novel_id, title, author, file_path, chapter_count in rows
+    ]
 
+
+# Imported on first use, since the parser package imports storage; cached so
+# chapter reads skip the import lookup. EpubParser keeps no state, so one
+# instance serves every thread.
+@lru_cache(maxsize=None)
 def get_file_reader():
     from ..parser.txt_parser import FileReader
     return FileReader
 
 
+@lru_cache(maxsize=None)
 def get_epub_parser():
     from ..parser.epub_parser import EpubParser
     return EpubParser()
@@ -19,23 +137,149 @@ def get_epub_parser():
 class PostgreSQLStorage(DatabaseInterface):
     """PostgreSQL implementation of the database interface."""
 
-    def __init__(self, connection_url: str):
+    # Databases whose schema this process has already brought up to date
+    _schema_ready: set[str] = set()
+
+    # Fewer than the API's threads on purpose (see THREADPOOL_SIZE), and small
+    # enough that a few API workers and the monitor stay within PostgreSQL's
+    # default max_connections of 100
+    def __init__(self, connection_url: str, min_connections: int = 2, max_connections: int = 16):
         self.connection_url = connection_url
         self.init_db()
 
+        # Reused across requests instead of a new connection (and handshake) per call
+        self._pool = _WarmConnectionPool(min_connections, max_connections, connection_url,
+                                         connection_factory=_PooledConnection)
+        # getconn() raises once the pool is exhausted; wait for a free connection instead
+        self._slots = threading.BoundedSemaphore(max_connections)
+
+        # Other processes - API workers, a separate monitor - NOTIFY their writes;
+        # reading version picks those up, as SQLite's data_version does
+        self._watch_lock = threading.Lock()
+        self._version = 0
+        self._own_pids: set[int] = set()  # Backends of our pooled connections
+        self._closed = threading.Event()
+        self._listen_conn = self._listen()
+
+    def _listen(self) -> Any:
+        """Open a connection that LISTENs for writes NOTIFYed on CHANGES_CHANNEL."""
+        conn = self.connect()
+        conn.autocommit = True
+        conn.cursor().execute(f"LISTEN {CHANGES_CHANNEL}")
+        return conn
+
+    def _relisten(self) -> None:
+        """Reopen the lost LISTEN connection, retrying every RELISTEN_INTERVAL seconds."""
+        while not self._closed.wait(RELISTEN_INTERVAL):
+            try:
+                conn = self._listen()
+            except psycopg2.Error:
+                continue
+            with self._watch_lock:
+                if self._closed.is_set():
+                    conn.close()
+                    return
+                self._listen_conn = conn
+                # Writes made while nobody listened were missed
+                self._version += 1
+            return
+
+    @property
+    def version(self) -> int:
+        """Bumped by local writes and by writes any other process NOTIFYs."""
+        with self._watch_lock:
+            conn = self._listen_conn
+            if conn is None:
+                return self._version  # _relisten is reconnecting
+
+            try:
+                # Doesn't block: only reads notifications that already arrived
+                conn.poll()
+            except psycopg2.Error:
+                # Whatever is sent while disconnected is lost, so count it as a change.
+                # API handlers read version on the event loop, so reconnecting is
+                # left to a thread rather than done here.
+                conn.close()
+                self._listen_conn = None
+                self._version += 1
+                threading.Thread(target=self._relisten, daemon=True).start()
+                return self._version
+
+            # Our own NOTIFYs come back too; bump_version has counted those
+            if any(notify.pid not in self._own_pids for notify in conn.notifies):
+                self._version += 1
+            conn.notifies.clear()
+            return self._version
+
+    def bump_version(self) -> None:
+        with self._watch_lock:
+            self._version += 1
+
+    @staticmethod
+    def _notify(cursor) -> None:
+        """Tell other processes that novels changed; inside a transaction, sent on commit."""
+        cursor.execute(f"NOTIFY {CHANGES_CHANNEL}")
+
     def connect(self) -> Any:
         """Create and return a database connection."""
-        conn = psycopg2.connect(self.connection_url)
-        conn.cursor_factory = psycopg2.extras.RealDictCursor
-        return conn
+        return psycopg2.connect(self.connection_url)
 
     def close_connection(self, conn: Any) -> None:
         """Close a database connection."""
         if conn:
             conn.close()
 
+    def close(self) -> None:
+        """Close every pooled connection."""
+        self._pool.closeall()
+        with self._watch_lock:
+            self._closed.set()
+            if self._listen_conn is not None:
+                self._listen_conn.close()
+
+    @contextmanager
+    def _conn(self, transaction: bool = False):
+        """Borrow a pooled connection; transaction=True runs the block as one transaction.
+
+        Otherwise each statement commits by itself, which spares reads and
+        single-statement writes the BEGIN and COMMIT round-trips psycopg2
+        would wrap around them.
+        """
+        with self._slots:
+            conn = self._pool.getconn()
+            try:
+                self._own_pids.add(conn.backend_pid)
+                conn.autocommit = not transaction
+                yield conn
+                if transaction:
+                    conn.commit()
+            except BaseException:
+                if transaction and not conn.closed:
+                    conn.rollback()
+                raise
+            finally:
+                self._pool.putconn(conn, close=bool(conn.closed))
+                # Only a broken connection is closed on the way back
+                if conn.closed:
+                    self._own_pids.discard(conn.backend_pid)
+
+    @staticmethod
+    def _scan_cursor(conn, name: str):
+        """A server-side cursor for whole-table reads; it needs a _conn(transaction=True).
+
+        Iterating it fetches SCAN_FETCH_ROWS rows at a time, so libpq never
+        holds the whole table next to the Python objects built from it.
+        """
+        cursor = conn.cursor(name=name)
+        cursor.itersize = SCAN_FETCH_ROWS
+        return cursor
+
     def init_db(self) -> None:
         """Initialize database tables."""
+        # Every statement is idempotent, so one run per process and database is
+        # enough; later instances skip the extra connection and the DDL
+        if self.connection_url in self._schema_ready:
+            return
         conn = self.connect()
         cursor = conn.cursor()
 
@@ -47,10 +291,38 @@ class PostgreSQLStorage(DatabaseInterface):
                 author TEXT,
                 file_path TEXT UNIQUE NOT NULL,
                 chapter_count INTEGER NOT NULL,
-                modified_time TEXT NOT NULL
+                modified_time TIMESTAMPTZ NOT NULL,
+                file_size BIGINT,
+                content_hash TEXT,
+                folder_parts TEXT[]
             )
             ''')
 
+            # Added after the first release; NULL makes old rows re-parse once
+            cursor.execute("ALTER TABLE novels ADD COLUMN IF NOT EXISTS file_size BIGINT")
+            cursor.execute("ALTER TABLE novels ADD COLUMN IF NOT EXISTS content_hash TEXT")
+            cursor.execute("ALTER TABLE novels ADD COLUMN IF NOT EXISTS folder_parts TEXT[]")
+
+            # modified_time was TEXT before; the cast reads the old strings in the
+            # server's TimeZone, and a row whose fingerprint comes out shifted is
+            # matched by its content hash on the next scan rather than re-parsed
+            cursor.execute('''
+            SELECT data_type FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = 'novels'
+              AND column_name = 'modified_time'
+            ''')
+            if cursor.fetchone()[0] == 'text':
+                cursor.execute('''
+                ALTER TABLE novels ALTER COLUMN modified_time TYPE TIMESTAMPTZ
+                USING modified_time::timestamptz
+                ''')
+
+            # Fill folder_parts of rows saved before the column existed
+            cursor.execute("SELECT id, file_path FROM novels WHERE folder_parts IS NULL")
+            psycopg2.extras.execute_batch(cursor, "UPDATE novels SET folder_parts = %s WHERE id = %s", [
+                (folder_names(file_path), novel_id) for novel_id, file_path in cursor.fetchall()
+            ])
+
             cursor.execute('''
             CREATE TABLE IF NOT EXISTS chapters (
                 id SERIAL PRIMARY KEY,
@@ -58,190 +330,294 @@ class PostgreSQLStorage(DatabaseInterface):
                 title TEXT NOT NULL,
                 start_line INTEGER,
                 end_line INTEGER,
+                start_byte BIGINT,
+                end_byte BIGINT,
                 chapter_index INTEGER NOT NULL,
                 spine_id TEXT,
                 FOREIGN KEY (novel_id) REFERENCES novels (id) ON DELETE CASCADE
             )
             ''')
 
+            # Added later; NULL reads by line numbers until the novel is re-parsed
+            cursor.execute('''
+            ALTER TABLE chapters
+            ADD COLUMN IF NOT EXISTS start_byte BIGINT,
+            ADD COLUMN IF NOT EXISTS end_byte BIGINT
+            ''')
+
+            # Serves the chapter list and the chapter deletes; INCLUDE (title)
+            # lets the chapter list be an index-only scan
+            cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_chapters_novel_index
+            ON chapters (novel_id, chapter_index) INCLUDE (title)
+            ''')
+
+            # search_folders matches whole directory names, so a GIN index on the
+            # path's directories answers it without scanning file_path
+            cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_novels_folder_parts
+            ON novels USING gin (folder_parts)
+            ''')
+
+            # Trigram indexes let search_novels' ILIKE '%...%' use an index instead of
+            # a scan. pg_trgm ships with PostgreSQL, but creating it can need more
+            # privileges than the app has; search still works without it.
+            cursor.execute("SAVEPOINT pg_trgm")
+            try:
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            except psycopg2.Error:
+                cursor.execute("ROLLBACK TO SAVEPOINT pg_trgm")
+            else:
+                cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_novels_title_trgm
+                ON novels USING gin (title gin_trgm_ops)
+                ''')
+                cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_novels_author_trgm
+                ON novels USING gin (author gin_trgm_ops)
+                ''')
+
             conn.commit()
+            self._schema_ready.add(self.connection_url)
         except Exception as e:
             conn.rollback()
             raise e
         finally:
             self.close_connection(conn)
 
-    def save_novel(self, novel_data: NovelMetadata, modified_time: str) -> Optional[int]:
+    def save_novel(self, novel_data: NovelMetadata, modified_time: str,
+                   file_size: Optional[int] = None) -> Optional[int]:
         """Save or update novel data."""
-        conn = self.connect()
-        cursor = conn.cursor()
+        with self._conn(transaction=True) as conn:
+            cursor = conn.cursor()
+            novel_id = self._write_novel(cursor, novel_data, modified_time, file_size)
+            self._notify(cursor)
 
-        cursor.execute("SELECT id FROM novels WHERE file_path = %s", (novel_data.file_path,))
-        existing = cursor.fetchone()
+        self.bump_version()
+        return novel_id
 
-        if existing:
-            novel_id = existing['id']
-            cursor.execute('''
-            UPDATE novels
-            SET title = %s, author = %s, chapter_count = %s, modified_time = %s
-            WHERE id = %s
-            ''', (novel_data.title, novel_data.author, novel_data.chapter_count,
-                  modified_time, novel_id))
-            cursor.execute("DELETE FROM chapters WHERE novel_id = %s", (novel_id,))
+    def save_novels(self, novels: List[Tuple[NovelMetadata, str, Optional[int]]]) -> List[Optional[int]]:
+        """Save or update several novels in one transaction."""
+        with self._conn(transaction=True) as conn:
+            cursor = conn.cursor()
+            novel_ids = [self._write_novel(cursor, novel_data, modified_time, file_size)
+                         for novel_data, modified_time, file_size in novels]
+            if novel_ids:
+                self._notify(cursor)
+
+        if novel_ids:
+            self.bump_version()
+        return novel_ids
+
+    def _write_novel(self, cursor, novel_data: NovelMetadata, modified_time: str,
+                     file_size: Optional[int]) -> int:
+        """Insert or update one novel and its chapters; the caller commits."""
+        # One statement for new and re-parsed novels; the row (and id) of a known path is kept
+        _execute_prepared(cursor, 'upsert_novel', (
+            novel_data.title, novel_data.author, novel_data.file_path, novel_data.chapter_count,
+            pg_timestamp(modified_time), file_size, novel_data.content_hash,
+            folder_names(novel_data.file_path)
+        ))
+        novel_id = cursor.fetchone()[0]
+        # Only a re-parsed novel has old chapters; for a new one this is an empty index probe
+        cursor.execute("DELETE FROM chapters WHERE novel_id = %s", (novel_id,))
+
+        rows = [(novel_id, chapter.title, chapter.start_line, chapter.end_line,
+                 chapter.start_byte, chapter.end_byte, chapter.chapter_index, chapter.spine_id)
+                for chapter in novel_data.chapters]
+        if len(rows) >= CHAPTER_COPY_ROWS:
+            # Past a few hundred rows COPY beats even multi-row INSERTs: nothing to parse
+            buffer = io.StringIO(''.join('\t'.join(map(copy_field, row)) + '\n' for row in rows))
+            cursor.copy_expert(
+                "COPY chapters (novel_id, title, start_line, end_line, start_byte, end_byte, "
+                "chapter_index, spine_id) FROM STDIN WITH (FORMAT text)",
+                buffer
+            )
         else:
-            cursor.execute('''
-            INSERT INTO novels (title, author, file_path, chapter_count, modified_time)
-            VALUES (%s, %s, %s, %s, %s) RETURNING id
-            ''', (novel_data.title, novel_data.author, novel_data.file_path,
-                  novel_data.chapter_count, modified_time))
-            novel_id = cursor.fetchone()['id']
+            # One multi-row INSERT per CHAPTER_PAGE_ROWS chapters instead of a round-trip each
+            psycopg2.extras.execute_values(cursor, '''
+            INSERT INTO chapters (novel_id, title, start_line, end_line, start_byte, end_byte,
+                                  chapter_index, spine_id)
+            VALUES %s
+            ''', rows, page_size=CHAPTER_PAGE_ROWS)
 
-        for chapter in novel_data.chapters:
-            cursor.execute('''
-            INSERT INTO chapters (novel_id, title, start_line, end_line, chapter_index, spine_id)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            ''', (novel_id, chapter.title, chapter.start_line,
-                  chapter.end_line, chapter.chapter_index, chapter.spine_id))
-
-        conn.commit()
-        self.close_connection(conn)
         return novel_id
 
-    def search_novels(self, query: str = "") -> List[Dict]:
-        """Search novels by title or author."""
-        conn = self.connect()
-        cursor = conn.cursor()
+    def get_fingerprint(self, file_path: str) -> Optional[Tuple[str, Optional[int]]]:
+        """Get the stored (modified_time, file_size) of a novel file."""
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT modified_time, file_size FROM novels WHERE file_path = %s", (file_path,))
+            row = cursor.fetchone()
 
-        if query.strip():
-            cursor.execute('''
-            SELECT id, title, author, file_path, chapter_count
-            FROM novels
-            WHERE title ILIKE %s OR author ILIKE %s
-            ''', (f'%{query}%', f'%{query}%'))
-        else:
+        if row is None:
+            return None
+        modified_time, file_size = row
+        return fingerprint_time(modified_time), file_size
+
+    def get_fingerprints(self) -> Dict[str, Tuple[str, Optional[int]]]:
+        """Get (modified_time, file_size) of every stored novel by file path."""
+        with self._conn(transaction=True) as conn, self._scan_cursor(conn, 'scan_fingerprints') as cursor:
+            cursor.execute("SELECT file_path, modified_time, file_size FROM novels")
+            return {file_path: (fingerprint_time(modified_time), file_size)
+                    for file_path, modified_time, file_size in cursor}
+
+    def get_content_hash(self, file_path: str) -> Optional[str]:
+        """Get the content hash stored with a novel file."""
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT content_hash FROM novels WHERE file_path = %s", (file_path,))
+            row = cursor.fetchone()
+
+        return row[0] if row else None
+
+    def update_fingerprints(self, fingerprints: List[Tuple[str, str, Optional[int]]]) -> None:
+        """Set (file_path, modified_time, file_size) of novels whose content is unchanged."""
+        if not fingerprints:
+            return
+        with self._conn(transaction=True) as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                "UPDATE novels SET modified_time = %s, file_size = %s WHERE file_path = %s",
+                [(pg_timestamp(modified_time), file_size, file_path)
+                 for file_path, modified_time, file_size in fingerprints]
+            )
+
+    def search_novels(self, query: str = "", limit: Optional[int] = None,
+                      offset: int = 0) -> List[Dict]:
+        """Search novels by title or author, ordered by id; limit None returns every match."""
+        # Listing the whole library reads through a server-side cursor, which needs a transaction
+        with self._conn(transaction=not query.strip()) as conn:
+            # LIMIT NULL is no limit
+            if query.strip():
+                cursor = conn.cursor()
+                cursor.execute('''
+                SELECT id, title, author, file_path, chapter_count
+                FROM novels
+                WHERE title ILIKE %(pattern)s OR author ILIKE %(pattern)s
+                ORDER BY id LIMIT %(limit)s OFFSET %(offset)s
+                ''', {'pattern': f'%{query}%', 'limit': limit, 'offset': offset})
+                return _novel_dicts(cursor.fetchall())
+
+            # An empty query lists the whole library, or a page of it
+            with self._scan_cursor(conn, 'list_novels') as cursor:
+                cursor.execute('''
+                SELECT id, title, author, file_path, chapter_count
+                FROM novels
+                ORDER BY id LIMIT %s OFFSET %s
+                ''', (limit, offset))
+                return _novel_dicts(cursor)
+
+    def search_folders(self, folder_name: str, limit: Optional[int] = None,
+                       offset: int = 0) -> List[Dict]:
+        """Search novels by folder path, ordered by id; limit None returns every match."""
+        with self._conn() as conn:
+            cursor = conn.cursor()
             cursor.execute('''
             SELECT id, title, author, file_path, chapter_count
             FROM novels
-            ''')
-
-        results = []
-        for row in cursor.fetchall():
-            novel_dict = dict(row)
-            results.append(novel_dict)
-
-        self.close_connection(conn)
-        return results
-
-    def search_folders(self, folder_name: str) -> List[Dict]:
-        """Search novels by folder path."""
-        conn = self.connect()
-        cursor = conn.cursor()
+            WHERE folder_parts @> ARRAY[%s]
+            ORDER BY id LIMIT %s OFFSET %s
+            ''', (folder_name, limit, offset))
+            rows = cursor.fetchall()
 
-        cursor.execute('''
-        SELECT id, title, author, file_path, chapter_count
-        FROM novels
-        WHERE file_path LIKE %s
-        ''', (f'%/{folder_name}/%',))
-
-        results = []
-        for row in cursor.fetchall():
-            novel_dict = dict(row)
-            results.append(novel_dict)
-
-        self.close_connection(conn)
-        return results
+        return _novel_dicts(rows)
 
     def get_novel_chapters(self, novel_id: int) -> Optional[List[Dict]]:
         """Get chapters for a novel."""
-        conn = self.connect()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-        SELECT id, title, chapter_index
-        FROM chapters
-        WHERE novel_id = %s
-        ORDER BY chapter_index
-        ''', (novel_id,))
-
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                'id': row['id'],
-                'title': row['title'],
-                'index': row['chapter_index']
-            })
-
-        self.close_connection(conn)
-        return results
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            _execute_prepared(cursor, 'novel_chapters', (novel_id,))
+            rows = cursor.fetchall()
+
+        return [
+            {
+                'id': chapter_id,
+                'title': title,
+                'index': chapter_index
+            }
+            for chapter_id, title, chapter_index in rows
+        ]
 
     def get_chapter_content(self, chapter_id: int) -> Optional[Dict]:
         """Get chapter content and metadata."""
-        conn = self.connect()
-        cursor = conn.cursor()
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            _execute_prepared(cursor, 'chapter_content', (chapter_id,))
+            row = cursor.fetchone()
 
-        cursor.execute('''
-        SELECT c.id, c.title, c.start_line, c.end_line, c.spine_id, c.chapter_index, c.spine_id, n.file_path
-        FROM chapters c
-        JOIN novels n ON c.novel_id = n.id
-        WHERE c.id = %s
-        ''', (chapter_id,))
-
-        row = cursor.fetchone()
-        if not row or not row['file_path']:
-            self.close_connection(conn)
+        # The connection is back in the pool before the (slow) file read
+        if not row or not row[8]:
             return None
 
-        file_path = Path(row['file_path'])
+        (chapter_id, title, start_line, end_line, start_byte, end_byte,
+         spine_id, chapter_index, file_path) = row
+        file_path = Path(file_path)
         if file_path.suffix.lower() == '.epub':
             parser = get_epub_parser()
-            content = parser.get_chapter_content(file_path, row['spine_id'])
+            content = parser.get_chapter_content(file_path, spine_id)
         else:
             parser = get_file_reader()
-            content = parser.read_content_by_lines(
-                file_path, row['start_line'], row['end_line']
-            )
+            if start_byte is not None:
+                content = parser.read_content_by_bytes(file_path, start_byte, end_byte)
+            else:
+                content = parser.read_content_by_lines(file_path, start_line, end_line)
         if content is None:
-            self.close_connection(conn)
             return None
 
-        self.close_connection(conn)
         return {
-            'id': row['id'],
-            'title': row['title'],
+            'id': chapter_id,
+            'title': title,
             'content': content,
-            'index': row['chapter_index']
+            'index': chapter_index
         }
 
     def delete_novel(self, file_path: str) -> Optional[Tuple[int, str]]:
         """Delete a novel by file path."""
-        conn = self.connect()
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT id, title FROM novels WHERE file_path = %s", (file_path,))
-        novel = cursor.fetchone()
-
-        if novel:
-            novel_id = novel['id']
-            title = novel['title']
-            cursor.execute("DELETE FROM novels WHERE id = %s", (novel_id,))
-            cursor.execute("DELETE FROM chapters WHERE novel_id = %s", (novel_id,))
-            conn.commit()
-            self.close_connection(conn)
-            return (novel_id, title)
-
-        self.close_connection(conn)
-        return None
+        # No transaction: a path that isn't stored costs one round-trip, and the
+        # NOTIFY after a hit follows the already committed delete
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            # Chapters go with it through the foreign key's ON DELETE CASCADE
+            cursor.execute("DELETE FROM novels WHERE file_path = %s RETURNING id, title", (file_path,))
+            novel = cursor.fetchone()
+            if novel:
+                self._notify(cursor)
+
+        if not novel:
+            return None
+        self.bump_version()
+        return novel  # (id, title)
+
+    def delete_novels(self, file_paths: List[str]) -> int:
+        """Delete several novels by file path in one transaction; returns how many existed."""
+        if not file_paths:
+            return 0
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            # Chapters go with them through the foreign key's ON DELETE CASCADE
+            cursor.execute("DELETE FROM novels WHERE file_path = ANY(%s)", (list(file_paths),))
+            deleted = cursor.rowcount
+            if deleted:
+                self._notify(cursor)
+
+        if deleted:
+            self.bump_version()
+        return deleted
 
     def update_novel_path(self, old_path: str, new_path: str) -> bool:
         """Update novel file path."""
-        conn = self.connect()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-        UPDATE novels SET file_path = %s WHERE file_path = %s
-        ''', (new_path, old_path))
-
-        success = cursor.rowcount > 0
-        conn.commit()
-        self.close_connection(conn)
+        # No transaction: a miss costs one round-trip and no commit, and the
+        # NOTIFY after a hit follows the already committed update
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+            UPDATE novels SET file_path = %s, folder_parts = %s WHERE file_path = %s RETURNING id
+            ''', (new_path, folder_names(new_path), old_path))
+            success = cursor.fetchone() is not None
+            if success:
+                self._notify(cursor)
+
+        if success:
+            self.bump_version()
         return success
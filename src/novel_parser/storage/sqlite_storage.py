@@ -1,40 +1,211 @@
+import queue
 import sqlite3
-from pathlib import Path
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path, PurePath
 from ..models.base import NovelMetadata
 from .database_interface import DatabaseInterface
 
 
+# SQL shared by every call, so each pooled connection's statement cache reuses it
+_SQL_LIST_NOVELS = "SELECT id, title, author, file_path, chapter_count FROM novels"
+# A stable order for paging; LIMIT -1 means no limit
+_SQL_PAGE = " ORDER BY id LIMIT ? OFFSET ?"
+_SQL_LIST_PAGE = _SQL_LIST_NOVELS + _SQL_PAGE
+_SQL_SEARCH_FTS = (_SQL_LIST_NOVELS +
+                   " WHERE id IN (SELECT rowid FROM novel_search WHERE novel_search MATCH ?)" +
+                   _SQL_PAGE)
+_SQL_SEARCH_INSTR = _SQL_LIST_NOVELS + " WHERE instr(search_key, ?) > 0" + _SQL_PAGE
+_SQL_SEARCH_FOLDER = (_SQL_LIST_NOVELS +
+                      " WHERE id IN (SELECT novel_id FROM novel_folders WHERE folder = ?)" +
+                      _SQL_PAGE)
+_SQL_INSERT_FOLDER = "INSERT OR IGNORE INTO novel_folders (novel_id, folder) VALUES (?, ?)"
+# One statement for new and re-parsed novels; the row (and id) of a known path is kept
+_SQL_UPSERT_NOVEL = '''
+INSERT INTO novels (title, author, file_path, chapter_count, modified_time, file_size,
+                    content_hash, search_key)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (file_path) DO UPDATE SET
+    title = excluded.title, author = excluded.author, chapter_count = excluded.chapter_count,
+    modified_time = excluded.modified_time, file_size = excluded.file_size,
+    content_hash = excluded.content_hash, search_key = excluded.search_key
+RETURNING id
+'''
+_SQL_INSERT_CHAPTER = '''
+INSERT INTO chapters (novel_id, title, start_line, end_line, start_byte, end_byte,
+                      chapter_index, spine_id)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Retries of BEGIN IMMEDIATE once the connection's own busy timeout has run out
+_BUSY_RETRIES = 5
+_BUSY_BACKOFF = 0.1  # seconds, doubled after every attempt
+
+
+def _is_busy(error: sqlite3.OperationalError) -> bool:
+    # Extended codes such as SQLITE_BUSY_SNAPSHOT keep the primary code in the low byte
+    return (error.sqlite_errorcode & 0xff) in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+
+
+def _novel_dicts(rows) -> list[dict]:
+    """Rows of _SQL_LIST_NOVELS as the dicts the API returns."""
+    return [
+        {'id': novel_id, 'title': title, 'author': author,
+         'file_path': file_path, 'chapter_count': chapter_count}
+        for novel_id, title, author, file_path, chapter_count in rows
+    ]
+
+
+# Imported on first use, since the parser package imports storage; cached so
+# chapter reads skip the import lookup. EpubParser keeps no state, so one
+# instance serves every thread.
+@lru_cache(maxsize=None)
 def get_file_reader():
     from ..parser.txt_parser import FileReader
     return FileReader
 
 
+@lru_cache(maxsize=None)
 def get_epub_parser():
     from ..parser.epub_parser import EpubParser
     return EpubParser()
 
 
+def make_search_key(title: str, author: str | None) -> str:
+    """Casefolded title and author, the haystack for search_novels."""
+    # The newline keeps a query from matching across title and author
+    return f"{title}\n{author or ''}".casefold()
+
+
+def folder_names(file_path: str) -> list[str]:
+    """Every directory on the way to the file, the keys search_folders matches."""
+    path = PurePath(file_path)
+    return [part for part in path.parent.parts if part != path.anchor]
+
+
+def fts_phrase(query: str) -> str:
+    """Quote a query as one FTS5 string so its characters are not parsed as syntax."""
+    return '"' + query.replace('"', '""') + '"'
+
+
 class SQLiteStorage(DatabaseInterface):
     """SQLite implementation of the database interface."""
-    def __init__(self, db_path: str = 'data/novels.db'):
+    def __init__(self, db_path: str = 'data/novels.db', pool_size: int = 4):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self.init_db()
 
+        # Long-lived connections shared by the API threads and the monitor.
+        # WAL lets readers run alongside the single writer the lock allows.
+        self._pool: queue.Queue = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(self.connect())
+        self._write_lock = threading.Lock()
+
+        # data_version changes whenever another connection - including one in
+        # another process, such as a separate monitor - commits to the file
+        self._watch_conn = self.connect()
+        self._watch_lock = threading.Lock()
+        self._data_version = None
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        """Bumped by local writes and by commits from any other connection."""
+        with self._watch_lock:
+            self._poll_data_version()
+            return self._version
+
+    def _poll_data_version(self) -> None:
+        """Count what other connections committed since the last look; needs _watch_lock."""
+        data_version = self._watch_conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version != self._data_version:
+            self._data_version = data_version
+            self._version += 1
+
+    def bump_version(self) -> None:
+        with self._watch_lock:
+            self._version += 1
+
     def connect(self):
         """Create and return a database connection."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        # Pooled connections move between threads, one user at a time.
+        # isolation_level=None: no implicit BEGIN, write transactions are explicit.
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               cached_statements=128, isolation_level=None)
+        self._configure(conn)
         return conn
 
+    @staticmethod
+    def _configure(conn):
+        """Per-connection settings; journal_mode=WAL is persistent and set in init_db."""
+        # WAL only needs fsync at checkpoints with NORMAL, and stays consistent on crash
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+        conn.execute("PRAGMA cache_size=-64000")    # ~64 MB
+        # Off by default; chapters rely on ON DELETE CASCADE
+        conn.execute("PRAGMA foreign_keys=ON")
+
     def close_connection(self, conn):
         """Close a database connection."""
         if conn:
             conn.close()
 
+    def close(self):
+        """Close every pooled connection."""
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+        self._watch_conn.close()
+
+    @contextmanager
+    def _conn(self, write: bool = False):
+        """Borrow a pooled connection; write=True runs the block as one transaction."""
+        if not write:
+            conn = self._pool.get()
+            try:
+                yield conn
+            finally:
+                self._pool.put(conn)
+            return
+
+        # Writers queue on the lock before taking a connection, so a burst of
+        # writes never holds pool slots the API's readers are waiting for
+        with self._write_lock:
+            conn = self._pool.get()
+            try:
+                # Take the database write lock up front; a DEFERRED transaction that
+                # upgrades after its first read can fail with SQLITE_BUSY instead
+                self._begin_immediate(conn)
+                try:
+                    yield conn
+                except BaseException:
+                    conn.rollback()
+                    raise
+                conn.commit()
+            finally:
+                self._pool.put(conn)
+
+    @staticmethod
+    def _begin_immediate(conn):
+        """BEGIN IMMEDIATE, backing off while another process holds the write lock."""
+        for attempt in range(_BUSY_RETRIES):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                return
+            except sqlite3.OperationalError as e:
+                if attempt == _BUSY_RETRIES - 1 or not _is_busy(e):
+                    raise
+            time.sleep(_BUSY_BACKOFF * 2 ** attempt)
+
     def init_db(self):
         conn = self.connect()
+        # Readers no longer block the monitor's writes, and commits write once
+        conn.execute("PRAGMA journal_mode=WAL")
         cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
 
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS novels (
@@ -43,7 +214,10 @@ class SQLiteStorage(DatabaseInterface):
             author TEXT,
             file_path TEXT UNIQUE NOT NULL,
             chapter_count INTEGER NOT NULL,
-            modified_time TEXT NOT NULL
+            modified_time TEXT NOT NULL,
+            file_size INTEGER,
+            content_hash TEXT,
+            search_key TEXT
         )
         ''')
 
@@ -54,180 +228,335 @@ class SQLiteStorage(DatabaseInterface):
             title TEXT NOT NULL,
             start_line INTEGER,
             end_line INTEGER,
+            start_byte INTEGER,
+            end_byte INTEGER,
             chapter_index INTEGER NOT NULL,
             spine_id TEXT,
             FOREIGN KEY (novel_id) REFERENCES novels (id) ON DELETE CASCADE
         )
         ''')
 
-        conn.commit()
-        self.close_connection(conn)
-
-    def save_novel(self, novel_data: NovelMetadata, modified_time: str) -> int | None:
-        conn = self.connect()
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT id FROM novels WHERE file_path = ?", (novel_data.file_path,))
-        existing = cursor.fetchone()
-
-        if existing:
-            novel_id = existing['id']
-            cursor.execute('''
-            UPDATE novels
-            SET title = ?, author = ?, chapter_count = ?, modified_time = ?
-            WHERE id = ?
-            ''', (novel_data.title, novel_data.author, novel_data.chapter_count,
-                  modified_time, novel_id))
-            cursor.execute("DELETE FROM chapters WHERE novel_id = ?", (novel_id,))
-        else:
-            cursor.execute('''
-            INSERT INTO novels (title, author, file_path, chapter_count, modified_time)
-            VALUES (?, ?, ?, ?, ?)
-            ''', (novel_data.title, novel_data.author, novel_data.file_path,
-                  novel_data.chapter_count, modified_time))
-            novel_id = cursor.lastrowid
+        # Serves the chapter list (ORDER BY chapter_index) and the chapter
+        # deletes; file_path lookups already use the UNIQUE constraint's index.
+        # With the title (and the implicit rowid) in the index, the chapter
+        # list is read from the index alone. Older databases built it without.
+        cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'idx_chapters_novel_index'")
+        row = cursor.fetchone()
+        if row and 'title' not in row[0]:
+            cursor.execute("DROP INDEX idx_chapters_novel_index")
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_chapters_novel_index
+        ON chapters (novel_id, chapter_index, title)
+        ''')
 
-        for chapter in novel_data.chapters:
-            cursor.execute('''
-            INSERT INTO chapters (novel_id, title, start_line, end_line, chapter_index, spine_id)
-            VALUES (?, ?, ?, ?, ?, ?)
-            ''', (novel_id, chapter.title, chapter.start_line,
-                  chapter.end_line, chapter.chapter_index, chapter.spine_id))
+        self._migrate_columns(cursor)
+        self.has_fts = self._create_search_index(cursor)
+        self._create_folder_index(cursor)
 
         conn.commit()
         self.close_connection(conn)
-        return novel_id
 
-    def search_novels(self, query: str = "") -> list[dict]:
-        conn = self.connect()
-        cursor = conn.cursor()
+    def _migrate_columns(self, cursor):
+        """Add columns missing from databases created by older versions."""
+        cursor.execute("PRAGMA table_info(novels)")
+        columns = {row[1] for row in cursor.fetchall()}  # (cid, name, type, ...)
+
+        if 'file_size' not in columns:
+            # Left NULL, so existing novels are re-parsed once on the next scan
+            cursor.execute("ALTER TABLE novels ADD COLUMN file_size INTEGER")
+        if 'content_hash' not in columns:
+            cursor.execute("ALTER TABLE novels ADD COLUMN content_hash TEXT")
+
+        cursor.execute("PRAGMA table_info(chapters)")
+        if 'start_byte' not in {row[1] for row in cursor.fetchall()}:
+            # NULL falls back to reading by line numbers until the novel is re-parsed
+            cursor.execute("ALTER TABLE chapters ADD COLUMN start_byte INTEGER")
+            cursor.execute("ALTER TABLE chapters ADD COLUMN end_byte INTEGER")
+
+        if 'search_key' in columns:
+            return
+        cursor.execute("ALTER TABLE novels ADD COLUMN search_key TEXT")
+        cursor.execute("SELECT id, title, author FROM novels")
+        cursor.executemany(
+            "UPDATE novels SET search_key = ? WHERE id = ?",
+            [(make_search_key(title, author), novel_id)
+             for novel_id, title, author in cursor.fetchall()]
+        )
 
-        if query.strip():
-            cursor.execute('''
-            SELECT id, title, author, file_path, chapter_count
-            FROM novels
-            WHERE title LIKE ? OR author LIKE ?
-            ''', (f'%{query}%', f'%{query}%'))
-        else:
+    def _create_folder_index(self, cursor):
+        """One row per (folder, novel); search_folders looks a folder up by equality."""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'novel_folders'")
+        if cursor.fetchone():
+            return
+        # NOCASE folds ASCII only, like the LIKE match this replaces
+        cursor.execute('''
+        CREATE TABLE novel_folders (
+            folder TEXT NOT NULL COLLATE NOCASE,
+            novel_id INTEGER NOT NULL REFERENCES novels (id) ON DELETE CASCADE,
+            PRIMARY KEY (folder, novel_id)
+        ) WITHOUT ROWID
+        ''')
+        cursor.execute("CREATE INDEX idx_novel_folders_novel ON novel_folders (novel_id)")
+        cursor.execute("SELECT id, file_path FROM novels")
+        cursor.executemany(_SQL_INSERT_FOLDER, [
+            (novel_id, folder)
+            for novel_id, file_path in cursor.fetchall()
+            for folder in folder_names(file_path)
+        ])
+
+    def _create_search_index(self, cursor) -> bool:
+        """Trigram index over search_key; False if this SQLite lacks the tokenizer (< 3.34)."""
+        cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'novel_search'")
+        row = cursor.fetchone()
+        if row and 'content=' in row[0]:
+            self._create_search_triggers(cursor)
+            return True
+        if row:
+            # Older databases kept their own copy of search_key in the index
+            cursor.execute("DROP TABLE novel_search")
+        try:
+            # External content: the index reads search_key from novels instead of storing it
             cursor.execute('''
-            SELECT id, title, author, file_path, chapter_count
-            FROM novels
+            CREATE VIRTUAL TABLE novel_search USING fts5(
+                search_key, content='novels', content_rowid='id', tokenize='trigram'
+            )
             ''')
+        except sqlite3.OperationalError:
+            return False
+        cursor.execute("INSERT INTO novel_search (novel_search) VALUES ('rebuild')")
+        self._create_search_triggers(cursor)
+        return True
+
+    @staticmethod
+    def _create_search_triggers(cursor):
+        """Keep novel_search in step with every write to novels."""
+        # An external-content index must be handed the old value to remove it
+        for trigger in ('''
+        CREATE TRIGGER IF NOT EXISTS novels_search_ai AFTER INSERT ON novels BEGIN
+            INSERT INTO novel_search (rowid, search_key) VALUES (new.id, new.search_key);
+        END
+        ''', '''
+        CREATE TRIGGER IF NOT EXISTS novels_search_ad AFTER DELETE ON novels BEGIN
+            INSERT INTO novel_search (novel_search, rowid, search_key)
+            VALUES ('delete', old.id, old.search_key);
+        END
+        ''', '''
+        CREATE TRIGGER IF NOT EXISTS novels_search_au AFTER UPDATE OF search_key ON novels BEGIN
+            INSERT INTO novel_search (novel_search, rowid, search_key)
+            VALUES ('delete', old.id, old.search_key);
+            INSERT INTO novel_search (rowid, search_key) VALUES (new.id, new.search_key);
+        END
+        '''):
+            cursor.execute(trigger)
+
+    def save_novel(self, novel_data: NovelMetadata, modified_time: str,
+                   file_size: int | None = None) -> int | None:
+        with self._conn(write=True) as conn:
+            novel_id = self._write_novel(conn.cursor(), novel_data, modified_time, file_size)
+
+        self.bump_version()
+        return novel_id
 
-        results = []
-        for row in cursor.fetchall():
-            novel_dict = dict(row)
-            results.append(novel_dict)
-
-        self.close_connection(conn)
-        return results
-
-    def search_folders(self, folder_name: str) -> list[dict]:
-        conn = self.connect()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-        SELECT id, title, author, file_path, chapter_count
-        FROM novels
-        WHERE file_path LIKE ?
-        ''', (f'%/{folder_name}/%',))
+    def save_novels(self, novels: list[tuple[NovelMetadata, str, int | None]]) -> list[int | None]:
+        with self._conn(write=True) as conn:
+            cursor = conn.cursor()
+            novel_ids = [self._write_novel(cursor, novel_data, modified_time, file_size)
+                         for novel_data, modified_time, file_size in novels]
+
+        if novel_ids:
+            self.bump_version()
+        return novel_ids
+
+    def _write_novel(self, cursor, novel_data: NovelMetadata, modified_time: str,
+                     file_size: int | None) -> int:
+        """Insert or update one novel and its chapters; the caller commits."""
+        cursor.execute(_SQL_UPSERT_NOVEL, (
+            novel_data.title, novel_data.author, novel_data.file_path, novel_data.chapter_count,
+            modified_time, file_size, novel_data.content_hash,
+            make_search_key(novel_data.title, novel_data.author)
+        ))
+        novel_id = cursor.fetchone()[0]
+        # Only a re-parsed novel has old chapters; for a new one this is an empty index probe
+        cursor.execute("DELETE FROM chapters WHERE novel_id = ?", (novel_id,))
+        # The path is the conflict key, so a re-parsed novel already has these
+        cursor.executemany(_SQL_INSERT_FOLDER, [
+            (novel_id, folder) for folder in folder_names(novel_data.file_path)
+        ])
+
+        cursor.executemany(_SQL_INSERT_CHAPTER, [
+            (novel_id, chapter.title, chapter.start_line, chapter.end_line,
+             chapter.start_byte, chapter.end_byte, chapter.chapter_index, chapter.spine_id)
+            for chapter in novel_data.chapters
+        ])
 
-        results = []
-        for row in cursor.fetchall():
-            novel_dict = dict(row)
-            results.append(novel_dict)
+        return novel_id
 
-        self.close_connection(conn)
-        return results
+    def get_fingerprint(self, file_path: str) -> tuple[str, int | None] | None:
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT modified_time, file_size FROM novels WHERE file_path = ?", (file_path,)
+            ).fetchone()
+
+        return row  # (modified_time, file_size) or None
+
+    def get_fingerprints(self) -> dict[str, tuple[str, int | None]]:
+        with self._conn() as conn:
+            rows = conn.execute("SELECT file_path, modified_time, file_size FROM novels").fetchall()
+
+        return {file_path: (modified_time, file_size)
+                for file_path, modified_time, file_size in rows}
+
+    def get_content_hash(self, file_path: str) -> str | None:
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT content_hash FROM novels WHERE file_path = ?", (file_path,)
+            ).fetchone()
+
+        return row[0] if row else None
+
+    def update_fingerprints(self, fingerprints: list[tuple[str, str, int | None]]) -> None:
+        if not fingerprints:
+            return
+        with self._conn(write=True) as conn:
+            conn.executemany(
+                "UPDATE novels SET modified_time = ?, file_size = ? WHERE file_path = ?",
+                [(modified_time, file_size, file_path)
+                 for file_path, modified_time, file_size in fingerprints]
+            )
+            # Nothing the API returns changes, so this commit must not move version.
+            # BEGIN IMMEDIATE keeps every other writer out until it, so other
+            # connections' earlier commits are counted now; the commit itself runs
+            # outside _watch_lock, which the API takes on every request.
+            with self._watch_lock:
+                self._poll_data_version()
+            conn.commit()
+            # A commit another process squeezes in right after this one is missed
+            # until cached responses expire. The data_version of other processes
+            # still moves: with the monitor running apart (RUN_MONITOR=false),
+            # touched files clear the API's caches as before.
+            with self._watch_lock:
+                self._data_version = self._watch_conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def search_novels(self, query: str = "", limit: int | None = None,
+                      offset: int = 0) -> list[dict]:
+        # Unicode-aware and wildcard-free, unlike LIKE, which only folds ASCII
+        query = query.strip().casefold()
+        page = (-1 if limit is None else limit, offset)
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            if query and self.has_fts and len(query) >= 3:
+                # Trigrams need at least three characters to look anything up
+                cursor.execute(_SQL_SEARCH_FTS, (fts_phrase(query), *page))
+            elif query:
+                cursor.execute(_SQL_SEARCH_INSTR, (query, *page))
+            else:
+                cursor.execute(_SQL_LIST_PAGE, page)
+            rows = cursor.fetchall()
+
+        return _novel_dicts(rows)
+
+    def search_folders(self, folder_name: str, limit: int | None = None,
+                       offset: int = 0) -> list[dict]:
+        with self._conn() as conn:
+            rows = conn.execute(_SQL_SEARCH_FOLDER, (
+                folder_name, -1 if limit is None else limit, offset
+            )).fetchall()
+
+        return _novel_dicts(rows)
 
     def get_novel_chapters(self, novel_id: int) ->list[dict] | None:
-        conn = self.connect()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-        SELECT id, title, chapter_index
-        FROM chapters
-        WHERE novel_id = ?
-        ORDER BY chapter_index
-        ''', (novel_id,))
-
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                'id': row['id'],
-                'title': row['title'],
-                'index': row['chapter_index']
-            })
-
-        self.close_connection(conn)
-        return results
+        with self._conn() as conn:
+            rows = conn.execute('''
+            SELECT id, title, chapter_index
+            FROM chapters
+            WHERE novel_id = ?
+            ORDER BY chapter_index
+            ''', (novel_id,)).fetchall()
+
+        return [
+            {
+                'id': chapter_id,
+                'title': title,
+                'index': chapter_index
+            }
+            for chapter_id, title, chapter_index in rows
+        ]
 
     def get_chapter_content(self, chapter_id: int) -> dict | None:
-        conn = self.connect()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-        SELECT c.id, c.title, c.start_line, c.end_line, c.spine_id, c.chapter_index, c.spine_id, n.file_path
-        FROM chapters c
-        JOIN novels n ON c.novel_id = n.id
-        WHERE c.id = ?
-        ''', (chapter_id,))
-
-        row = cursor.fetchone()
-        if not row or not row['file_path']:
-            self.close_connection(conn)
+        with self._conn() as conn:
+            row = conn.execute('''
+            SELECT c.id, c.title, c.start_line, c.end_line, c.start_byte, c.end_byte,
+                   c.spine_id, c.chapter_index, n.file_path
+            FROM chapters c
+            JOIN novels n ON c.novel_id = n.id
+            WHERE c.id = ?
+            ''', (chapter_id,)).fetchone()
+
+        # The connection is back in the pool before the (slow) file read
+        if not row or not row[8]:
             return None
 
-        file_path = Path(row['file_path'])
+        (chapter_id, title, start_line, end_line, start_byte, end_byte,
+         spine_id, chapter_index, file_path) = row
+        file_path = Path(file_path)
         if file_path.suffix.lower() == '.epub':
             parser = get_epub_parser()
-            content = parser.get_chapter_content(file_path, row['spine_id'])
+            content = parser.get_chapter_content(file_path, spine_id)
         else:
             parser = get_file_reader()
-            content = parser.read_content_by_lines(
-                file_path, row['start_line'], row['end_line']
-            )
+            if start_byte is not None:
+                content = parser.read_content_by_bytes(file_path, start_byte, end_byte)
+            else:
+                content = parser.read_content_by_lines(file_path, start_line, end_line)
         if content is None:
-            self.close_connection(conn)
             return None
 
-        self.close_connection(conn)
         return {
-            'id': row['id'],
-            'title': row['title'],
+            'id': chapter_id,
+            'title': title,
             'content': content,
-            'index': row['chapter_index']
+            'index': chapter_index
         }
 
     def delete_novel(self, file_path: str) -> tuple[int, str] | None:
-        conn = self.connect()
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT id, title FROM novels WHERE file_path = ?", (file_path,))
-        novel = cursor.fetchone()
-
-        if novel:
-            novel_id = novel['id']
-            title = novel['title']
+        with self._conn(write=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, title FROM novels WHERE file_path = ?", (file_path,))
+            novel = cursor.fetchone()
+            if not novel:
+                return None
+
+            novel_id, title = novel
+            # Chapters go with it through the foreign key's ON DELETE CASCADE
             cursor.execute("DELETE FROM novels WHERE id = ?", (novel_id,))
-            cursor.execute("DELETE FROM chapters WHERE novel_id = ?", (novel_id,))
-            conn.commit()
-            self.close_connection(conn)
-            return (novel_id, title)
 
-        self.close_connection(conn)
-        return None
+        self.bump_version()
+        return (novel_id, title)
 
-    def update_novel_path(self, old_path: str, new_path: str) -> bool:
-        conn = self.connect()
-        cursor = conn.cursor()
+    def delete_novels(self, file_paths: list[str]) -> int:
+        if not file_paths:
+            return 0
+        with self._conn(write=True) as conn:
+            deleted = conn.executemany(
+                "DELETE FROM novels WHERE file_path = ?", [(path,) for path in file_paths]
+            ).rowcount
 
-        cursor.execute('''
-        UPDATE novels SET file_path = ? WHERE file_path = ?
-        ''', (new_path, old_path))
+        if deleted:
+            self.bump_version()
+        return deleted
 
-        success = cursor.rowcount > 0
-        conn.commit()
-        self.close_connection(conn)
+    def update_novel_path(self, old_path: str, new_path: str) -> bool:
+        with self._conn(write=True) as conn:
+            row = conn.execute('''
+            UPDATE novels SET file_path = ? WHERE file_path = ? RETURNING id
+            ''', (new_path, old_path)).fetchone()
+            success = row is not None
+            if success:
+                conn.execute("DELETE FROM novel_folders WHERE novel_id = ?", row)
+                conn.executemany(_SQL_INSERT_FOLDER, [
+                    (row[0], folder) for folder in folder_names(new_path)
+                ])
+
+        if success:
+            self.bump_version()
         return success
-
@@ -0,0 +1,71 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from novel_parser.api import create_app
+from novel_parser.models.base import ChapterMetadata, NovelMetadata
+from novel_parser.storage import SQLiteStorage
+
+MODIFIED_TIME = "2024-01-01T00:00:00.000000"
+
+
+def make_novel(path, title):
+    path.write_text("第一章 开端\n内容\n", encoding="utf-8")
+    return NovelMetadata(
+        title=title, file_path=str(path), chapter_count=1,
+        chapters=[ChapterMetadata(title="第一章 开端", start_line=0, end_line=2, chapter_index=0)],
+    )
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "novels.db"))
+    yield storage
+    storage.close()
+
+
+@pytest.fixture
+def client(storage):
+    return TestClient(create_app(storage))
+
+
+def test_wildcard_if_none_match_on_missing_chapter(client):
+    response = client.get("/api/chapters/99999", headers={"If-None-Match": "*"})
+    assert response.status_code == 404
+
+
+def test_wildcard_if_none_match_on_existing_chapter(tmp_path, storage, client):
+    novel_id = storage.save_novel(make_novel(tmp_path / "a.txt", "a"), MODIFIED_TIME, 1)
+    chapter_id = client.get(f"/api/novels/{novel_id}/chapters").json()[0]["id"]
+    response = client.get(f"/api/chapters/{chapter_id}", headers={"If-None-Match": "*"})
+    assert response.status_code == 200
+
+
+def test_matching_etag_is_not_modified(tmp_path, storage, client):
+    novel_id = storage.save_novel(make_novel(tmp_path / "a.txt", "a"), MODIFIED_TIME, 1)
+    etag = client.get(f"/api/novels/{novel_id}/chapters").headers["ETag"]
+    # Another worker process builds the same tag for the same content
+    other = TestClient(create_app(storage))
+    response = other.get(f"/api/novels/{novel_id}/chapters", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_write_through_another_connection_invalidates_cache(tmp_path, storage, client):
+    assert client.get("/api/novels/search").json() == []
+
+    # A separate monitor process writes through its own connections
+    other = SQLiteStorage(str(tmp_path / "novels.db"))
+    try:
+        other.save_novel(make_novel(tmp_path / "a.txt", "新书"), MODIFIED_TIME, 1)
+    finally:
+        other.close()
+
+    titles = [novel["title"] for novel in client.get("/api/novels/search").json()]
+    assert titles == ["新书"]
+
+
+def test_fingerprint_update_keeps_cache(tmp_path, storage):
+    novel = make_novel(tmp_path / "a.txt", "a")
+    storage.save_novel(novel, MODIFIED_TIME, 1)
+    version = storage.version
+    storage.update_fingerprints([(novel.file_path, "2024-01-02T00:00:00.000000", 1)])
+    assert storage.version == version
@@ -0,0 +1,47 @@
+from novel_parser.api.cache import ResponseCache
+
+
+def test_hit_at_same_version():
+    cache = ResponseCache()
+    cache.set("k", b"v", 1)
+    assert cache.get("k", 1) == b"v"
+
+
+def test_newer_version_clears():
+    cache = ResponseCache()
+    cache.set("k", b"v", 1)
+    assert cache.get("k", 2) is None
+    cache.set("k", b"new", 2)
+    assert cache.get("k", 2) == b"new"
+
+
+def test_stale_version_is_a_miss_not_a_reset():
+    cache = ResponseCache()
+    cache.set("k", b"v", 2)
+    # A request that read the version just before a concurrent bump
+    assert cache.get("k", 1) is None
+    cache.set("other", b"old", 1)
+    assert cache.get("k", 2) == b"v"
+    assert cache.get("other", 2) is None
+
+
+def test_evicts_against_byte_budget():
+    cache = ResponseCache(maxsize=100, max_bytes=100)
+    for key in range(5):
+        cache.set(key, b"x" * 20, 1)
+    cache.set("last", b"y" * 20, 1)
+    assert cache.get(0, 1) is None
+    assert all(cache.get(key, 1) for key in range(1, 5))
+    assert cache.get("last", 1)
+
+
+def test_skips_oversized_body():
+    cache = ResponseCache(max_bytes=100)
+    cache.set("big", b"x" * 26, 1)
+    assert cache.get("big", 1) is None
+
+
+def test_explicit_size():
+    cache = ResponseCache(max_bytes=100)
+    cache.set("k", (b"x" * 20, "etag"), 1, 20)
+    assert cache.get("k", 1) == (b"x" * 20, "etag")
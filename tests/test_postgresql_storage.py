@@ -0,0 +1,176 @@
+"""PostgreSQLStorage against an in-memory stand-in for psycopg2 connections.
+
+The real ThreadedConnectionPool is used, so these cover how connections are
+opened, reused and notified about, not the SQL itself.
+"""
+import threading
+from collections import namedtuple
+from types import SimpleNamespace
+
+import psycopg2
+import psycopg2.extensions
+import pytest
+
+from novel_parser.storage import postgresql_storage
+from novel_parser.storage.postgresql_storage import PostgreSQLStorage
+
+Notify = namedtuple("Notify", "pid channel payload")
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.connection = conn
+        self.rowcount = 0
+
+    def execute(self, sql, args=None):
+        self.connection.statements.append(sql)
+        if sql.startswith("NOTIFY"):
+            self.connection.server.notify(self.connection.pid)
+
+    def fetchone(self):
+        return ("timestamp with time zone",)
+
+    def fetchall(self):
+        return []
+
+
+class FakeConnection:
+    def __init__(self, server):
+        self.server = server
+        self.pid = server.next_pid()
+        self.statements = []
+        self.notifies = []
+        self.closed = 0
+        self.autocommit = False
+        self.broken = False
+        self.info = SimpleNamespace(transaction_status=psycopg2.extensions.TRANSACTION_STATUS_IDLE)
+
+    def cursor(self, name=None):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+    def get_backend_pid(self):
+        return self.pid
+
+    def poll(self):
+        if self.broken:
+            raise psycopg2.OperationalError("server closed the connection")
+
+
+class FakeServer:
+    def __init__(self):
+        self.connections = []
+        self.down = False
+        self._lock = threading.Lock()
+        self._pid = 1000
+
+    def next_pid(self):
+        with self._lock:
+            self._pid += 1
+            return self._pid
+
+    def connect(self, *args, connection_factory=None, **kwargs):
+        if self.down:
+            raise psycopg2.OperationalError("could not connect to server")
+        conn = FakeConnection(self)
+        if connection_factory is not None:
+            # What _PooledConnection adds to a real connection
+            conn.prepared = set()
+            conn.backend_pid = conn.pid
+        with self._lock:
+            self.connections.append(conn)
+        return conn
+
+    def notify(self, pid):
+        for conn in self.connections:
+            if any("LISTEN" in sql for sql in conn.statements) and not conn.closed:
+                conn.notifies.append(Notify(pid, postgresql_storage.CHANGES_CHANNEL, ""))
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = FakeServer()
+    monkeypatch.setattr(psycopg2, "connect", server.connect)
+    monkeypatch.setattr(PostgreSQLStorage, "_schema_ready", set())
+    return server
+
+
+@pytest.fixture
+def storage(server):
+    storage = PostgreSQLStorage("postgresql://test")
+    yield storage
+    storage.close()
+
+
+def test_own_writes_are_counted_once(storage):
+    version = storage.version
+    storage.delete_novels(["/missing.txt"])  # rowcount 0: nothing to announce
+    assert storage.version == version
+
+    with storage._conn() as conn:
+        storage._notify(conn.cursor())
+    storage.bump_version()
+    assert storage.version == version + 1
+
+
+def test_write_from_another_process_bumps_version(server, storage):
+    version = storage.version
+    other = PostgreSQLStorage("postgresql://test")
+    try:
+        with other._conn() as conn:
+            other._notify(conn.cursor())
+    finally:
+        other.close()
+    assert storage.version == version + 1
+    assert storage.version == version + 1
+
+
+def test_lost_listener_does_not_raise_or_reconnect_inline(server, storage):
+    version = storage.version
+    server.down = True
+    storage._listen_conn.broken = True
+    connections = len(server.connections)
+
+    assert storage.version == version + 1
+    assert storage.version == version + 1
+    assert len(server.connections) == connections
+
+
+def test_concurrent_calls_reuse_returned_connections(server, storage):
+    threads_count = 8
+    barrier = threading.Barrier(threads_count)
+
+    def call():
+        with storage._conn():
+            barrier.wait()  # all checked out at once
+
+    for _ in range(3):
+        threads = [threading.Thread(target=call) for _ in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    pooled = [conn for conn in server.connections if hasattr(conn, "prepared")]
+    assert len(pooled) <= threads_count
+    assert not any(conn.closed for conn in pooled)
+
+
+def test_statements_are_prepared_on_first_use(server, storage):
+    with storage._conn() as conn:
+        assert conn.statements == []
+
+    storage.get_novel_chapters(1)
+    storage.get_novel_chapters(2)
+
+    prepares = [sql.split()[1] for conn in server.connections
+                for sql in conn.statements if sql.startswith("PREPARE")]
+    assert prepares == ["novel_chapters"]